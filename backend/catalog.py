@@ -0,0 +1,212 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import os
+import copy
+import time
+import asyncio
+import logging
+from datetime import date
+from typing import Callable, Optional
+from fastapi import HTTPException
+from database import stores_collection, categories_collection, metadata_collection
+from pricing import summary_fields, PriceMatrix, DealSchedule
+from search_index import SearchIndex, SuggestTrie
+from routing import LocationIndex
+
+logger = logging.getLogger("savour.catalog")
+
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "30"))
+
+
+def _flatten_locations(stores: list[dict]) -> list[dict]:
+    """Flatten every chain's locations into individual map entries."""
+    result = []
+    for s in stores:
+        # Handle new multi-location format
+        locations = s.get("locations", [])
+        if locations:
+            for loc in locations:
+                result.append({
+                    "store_id": s["store_id"],
+                    "location_id": loc.get("location_id"),
+                    "name": s["name"],
+                    "color": s["color"],
+                    "address": loc.get("address", ""),
+                    "lat": loc["lat"],
+                    "lng": loc["lng"]
+                })
+        # Fallback for old single-location format
+        elif "lat" in s and "lng" in s:
+            result.append({
+                "store_id": s["store_id"],
+                "name": s["name"],
+                "color": s["color"],
+                "address": s.get("address", ""),
+                "lat": s["lat"],
+                "lng": s["lng"]
+            })
+    return result
+
+
+class CatalogSnapshot:
+    """Read-only view of stores, categories, deals and locations at one price version.
+
+    Snapshots are never mutated after construction; a reload builds a new one
+    and swaps the reference, so handlers always see a consistent catalog.
+    """
+
+    def __init__(self, version: Optional[str], metadata: dict, stores: list[dict], categories: list[dict]):
+        self.version = version
+        self.metadata = metadata
+        self.stores = stores
+        self.stores_by_id = {s["store_id"]: s for s in stores}
+        self.categories = categories
+        self.categories_by_id = {c["category_id"]: c for c in categories}
+        # Categories that can appear in list views, with their sort keys for keyset paging
+        self.listed = [c for c in categories if c.get("cheapest_store")]
+        self.listed_keys = [c.get("sort_order", 0) for c in self.listed]
+        self.search_index = SearchIndex(self.listed)
+        self.suggest_trie = SuggestTrie(self.listed)
+        self.locations = _flatten_locations(stores)
+        self.location_index = LocationIndex(self.locations)
+        self.deal_schedule = DealSchedule(categories)
+        self.price_matrix = PriceMatrix(categories, stores)
+        # Changes whenever effective prices can change: reseed or a deal expiring
+        self.price_version = f"{version}|{self.price_matrix.as_of.isoformat()}"
+
+    def with_prices(self, as_of: date) -> "CatalogSnapshot":
+        """Copy of this snapshot whose price table is rebuilt for `as_of`; indexes are shared."""
+        repriced = copy.copy(self)
+        repriced.price_matrix = PriceMatrix(self.categories, self.stores, as_of)
+        repriced.price_version = f"{self.version}|{as_of.isoformat()}"
+        return repriced
+
+
+async def load_snapshot() -> CatalogSnapshot:
+    """Read the full catalog from MongoDB."""
+    meta = await metadata_collection.find_one({"key": "prices"}) or {}
+    stores, categories = await asyncio.gather(
+        stores_collection.find({}).to_list(None),
+        categories_collection.find({}).sort("sort_order", 1).to_list(None),
+    )
+    # Documents seeded before summary fields were materialized get them computed once here
+    backfilled = 0
+    for cat in categories:
+        if "cheapest_store" not in cat and cat.get("prices"):
+            cat.update(summary_fields(cat))
+            backfilled += 1
+    if backfilled:
+        logger.warning("catalog.summary_backfill count=%s (run scripts/refresh_summaries.py)", backfilled)
+
+    metadata = {
+        "last_updated": meta.get("last_updated"),
+        "source": meta.get("source")
+    }
+    # Index and price-table builds are CPU-bound: keep them off the event loop
+    return await asyncio.to_thread(CatalogSnapshot, metadata["last_updated"], metadata, stores, categories)
+
+
+async def _current_version() -> Optional[str]:
+    meta = await metadata_collection.find_one({"key": "prices"}, {"last_updated": 1})
+    return meta.get("last_updated") if meta else None
+
+
+class CatalogStore:
+    """Holds the current snapshot and reloads it when metadata.last_updated changes."""
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._listeners: list[Callable[[CatalogSnapshot], None]] = []
+        self._swapped = asyncio.Event()
+
+    def subscribe(self, callback: Callable[[CatalogSnapshot], None]) -> None:
+        """Call `callback(snapshot)` after every swap, e.g. to drop caches keyed on the old version."""
+        self._listeners.append(callback)
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        if self._snapshot is None:
+            raise HTTPException(status_code=503, detail="Catalog not loaded yet")
+        return self._snapshot
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Reload the catalog if its version changed. Returns True when swapped."""
+        async with self._lock:
+            if not force and self._snapshot is not None:
+                if await _current_version() == self._snapshot.version:
+                    return False
+
+            snapshot = await load_snapshot()
+            self._swap(snapshot)
+            logger.info(
+                "catalog.reloaded version=%s stores=%s categories=%s",
+                snapshot.version,
+                len(snapshot.stores),
+                len(snapshot.categories),
+            )
+            return True
+
+    def _swap(self, snapshot: CatalogSnapshot) -> None:
+        self._snapshot = snapshot
+        self._swapped.set()
+        for callback in self._listeners:
+            callback(snapshot)
+
+    async def reprice(self) -> None:
+        """Swap in a price table for today, dropping deals that have ended."""
+        current = self._snapshot
+        if current is None or current.price_matrix.as_of == date.today():
+            return
+        repriced = await asyncio.to_thread(current.with_prices, date.today())
+        if self._snapshot is not current:
+            # A reload swapped in a fresh snapshot (priced for today) while this one was building
+            return
+        self._swap(repriced)
+        logger.info("catalog.repriced version=%s as_of=%s", current.version, date.today().isoformat())
+
+    async def expire_deals_forever(self) -> None:
+        """Background task: rebuild the price table exactly when the next deal expires.
+
+        Sleeps until the earliest expiry in the snapshot's DealSchedule, or
+        until a reload swaps in a snapshot that may expire sooner.
+        """
+        while True:
+            self._swapped.clear()
+            snapshot = self._snapshot
+            next_expiry = snapshot.deal_schedule.next_expiry(time.time()) if snapshot else None
+            timeout = max(0.0, next_expiry - time.time()) if next_expiry is not None else None
+            try:
+                await asyncio.wait_for(self._swapped.wait(), timeout=timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.reprice()
+            except Exception as exc:
+                logger.exception("catalog.reprice_failed error=%s", exc)
+
+    async def poll_forever(self, interval: float = CATALOG_POLL_SECONDS) -> None:
+        """Background task: check the metadata version every `interval` seconds."""
+        while True:
+            try:
+                await self.refresh(force=self._snapshot is None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("catalog.refresh_failed error=%s", exc)
+            await asyncio.sleep(interval)
+
+
+catalog = CatalogStore()
+
@@ -0,0 +1,138 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Optional
+import httpx
+
+logger = logging.getLogger("savour.circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of calling an upstream whose breaker is open.
+
+    Subclasses httpx.HTTPError so callers' existing upstream-failure
+    handling (and fallbacks) apply unchanged.
+    """
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a rolling window of recent calls.
+
+    Closed: calls go through; once the window holds `min_calls`, an error
+    rate of `error_rate` or a p95 latency of `p95_seconds` opens it.
+    Open: calls are refused for `cooldown_seconds`.
+    Half-open: a single probe call is let through; success closes the
+    breaker with a fresh window, failure reopens it.
+    """
+
+    def __init__(self, name: str, error_rate: float = 0.5, p95_seconds: float = 3.0,
+                 cooldown_seconds: float = 30.0, window: int = 50, min_calls: int = 10):
+        self.name = name
+        self.error_rate = error_rate
+        self.p95_seconds = p95_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.min_calls = min_calls
+        self._calls: deque[tuple[bool, float]] = deque(maxlen=window)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe slot when half-open)."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            logger.info("breaker.half_open name=%s", self.name)
+        if self.state == HALF_OPEN:
+            now = time.monotonic()
+            # A probe abandoned without an outcome (caller cancelled) frees its slot after a cooldown
+            if self._probe_started is not None and now - self._probe_started < self.cooldown_seconds:
+                self.rejected += 1
+                return False
+            self._probe_started = now
+        return True
+
+    def record(self, ok: bool, seconds: float) -> None:
+        if self.state == HALF_OPEN:
+            self._probe_started = None
+            if ok and seconds < self.p95_seconds:
+                self.state = CLOSED
+                self._calls.clear()
+                logger.info("breaker.closed name=%s", self.name)
+            else:
+                self._open("probe_failed")
+            return
+        if self.state == OPEN:
+            # A call admitted before the breaker opened finished late
+            return
+
+        self._calls.append((ok, seconds))
+        if len(self._calls) < self.min_calls:
+            return
+        if self.failure_rate() >= self.error_rate:
+            self._open("error_rate")
+        elif self.p95() >= self.p95_seconds:
+            self._open("latency")
+
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        logger.warning(
+            "breaker.open name=%s reason=%s error_rate=%s p95_ms=%s",
+            self.name, reason, round(self.failure_rate(), 4), round((self.p95() or 0.0) * 1000, 1),
+        )
+
+    def failure_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(not ok for ok, _ in self._calls) / len(self._calls)
+
+    def p95(self) -> Optional[float]:
+        """p95 latency (seconds) over the window, failures included."""
+        if not self._calls:
+            return None
+        return _percentile([seconds for _, seconds in self._calls], 0.95)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of successful calls once the window is warm; None when hedging should not fire."""
+        if self.state != CLOSED:
+            return None
+        latencies = [seconds for ok, seconds in self._calls if ok]
+        if len(latencies) < self.min_calls:
+            return None
+        return _percentile(latencies, 0.95)
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "error_rate": round(self.failure_rate(), 4),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate_threshold": self.error_rate,
+            "p95_threshold_ms": round(self.p95_seconds * 1000, 1),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,58 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import re
+from typing import Optional
+from search_index import normalize, tokenize
+
+# Package sizes inside titles ("4 L", "500g", "12 x 355 mL") are not part of what the product is
+_SIZE_RE = re.compile(
+    r"\b\d+(?:[.,]\d+)?\s*(?:x\s*\d+(?:[.,]\d+)?\s*)?"
+    r"(?:kg|g|mg|l|ml|lb|lbs|oz|ea|pk|pack|count|ct|un|units?)\b"
+)
+
+
+def equivalence_key(title: str, brand: str, unit: str) -> Optional[str]:
+    """Commodity key for a product: title without brand or sizes, plus its package unit.
+
+    Two products with the same key are the same thing in the same quantity,
+    e.g. "Natrel Milk, 2%" and "Québon Milk 2%" both sold as "4 L".
+    """
+    core = " ".join(tokenize(_SIZE_RE.sub(" ", normalize(title))))
+    brand_text = " ".join(tokenize(brand or ""))
+    if brand_text:
+        core = " ".join(re.sub(rf"\b{re.escape(brand_text)}\b", " ", core).split())
+    if not core:
+        return None
+    return f"{core}|{' '.join(tokenize(unit or ''))}"
+
+
+def assign_equivalence_groups(categories: list[dict], patterns: list[Optional[str]]) -> int:
+    """Set `equivalence_group` on each category; returns the number of multi-product groups.
+
+    Only products picked by one of the seed's commodity patterns are grouped
+    (the fill pass takes arbitrary products). A group is named after its first
+    member's category_id; every other product is its own group.
+    """
+    members: dict[str, list[dict]] = {}
+    for cat, pattern in zip(categories, patterns):
+        cat["equivalence_group"] = cat["category_id"]
+        if pattern is None:
+            continue
+        key = equivalence_key(cat["name"], cat.get("brand", ""), cat.get("unit", ""))
+        if key is not None:
+            members.setdefault(key, []).append(cat)
+
+    grouped = 0
+    for group in members.values():
+        if len(group) < 2:
+            continue
+        grouped += 1
+        for cat in group:
+            cat["equivalence_group"] = group[0]["category_id"]
+    return grouped
@@ -0,0 +1,126 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import gzip
+import json
+import asyncio
+import hashlib
+from typing import Any, Callable, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip and identity still work without it
+    brotli = None
+
+CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+
+# Most of the size win at a fraction of the CPU of gzip-9 / brotli-11, paid once per catalog version
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class CachedBody:
+    """One serialized response body, pre-compressed once per catalog version."""
+
+    def __init__(self, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Strong validators must differ per representation, so each encoding gets its own tag
+        self.variants: dict[str, tuple[bytes, str]] = {
+            "identity": (body, f'"{digest}"'),
+            "gzip": (gzip.compress(body, compresslevel=GZIP_LEVEL), f'"{digest}-gzip"'),
+        }
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=BROTLI_QUALITY), f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+
+def _serialize(build: Callable[[], Any]) -> CachedBody:
+    payload = build()
+    if isinstance(payload, BaseModel):
+        body = payload.model_dump_json().encode()
+    else:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    return CachedBody(body)
+
+
+class ResponseCache:
+    """Serialized response bodies keyed by route, valid for a single catalog version.
+
+    Serialization and compression run in a worker thread, once per key and
+    version: concurrent first requests after a catalog change share one build.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[Optional[str], CachedBody]] = {}
+        self._building: dict[tuple[str, Optional[str]], asyncio.Future] = {}
+
+    async def get(self, key: str, version: Optional[str], build: Callable[[], Any]) -> CachedBody:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        pending = self._building.get((key, version))
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(_serialize, build))
+            self._building[(key, version)] = pending
+            pending.add_done_callback(lambda _: self._building.pop((key, version), None))
+        cached = await asyncio.shield(pending)
+        self._entries[key] = (version, cached)
+        return cached
+
+
+def _pick_encoding(accept_encoding: str, available: dict) -> str:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, etags: set[str]) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+response_cache = ResponseCache()
+
+
+async def cached_json_response(request: Request, key: str, version: Optional[str],
+                               build: Callable[[], Any]) -> Response:
+    """Serve a JSON body from the version cache, honouring If-None-Match and Accept-Encoding."""
+    cached = await response_cache.get(key, version, build)
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""), cached.variants)
+    body, etag = cached.variants[encoding]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cached.etags):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
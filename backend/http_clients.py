@@ -0,0 +1,193 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Optional
+import httpx
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    _HTTP2_AVAILABLE = True
+except ImportError:  # h2 is optional; clients fall back to HTTP/1.1 keep-alive
+    _HTTP2_AVAILABLE = False
+
+logger = logging.getLogger("savour.http_clients")
+
+HTTP2_ENABLED = os.getenv("UPSTREAM_HTTP2", "1") != "0"
+
+
+def _failed(response: httpx.Response) -> bool:
+    """Responses that count against the upstream's health (client errors do not)."""
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class UpstreamClient:
+    """One pooled AsyncClient per upstream API, opened in the app lifespan.
+
+    Pool size and timeouts come from `<PREFIX>_MAX_CONNECTIONS`,
+    `<PREFIX>_MAX_KEEPALIVE`, `<PREFIX>_TIMEOUT_SECONDS` and
+    `<PREFIX>_CONNECT_TIMEOUT_SECONDS`. In-flight counts against the
+    connection limit are tracked so the limits can be sized from /health.
+
+    Every call runs under a circuit breaker and an overall deadline
+    (`<PREFIX>_DEADLINE_SECONDS`); breaker thresholds come from
+    `<PREFIX>_BREAKER_ERROR_RATE`, `<PREFIX>_BREAKER_P95_SECONDS` and
+    `<PREFIX>_BREAKER_COOLDOWN_SECONDS`. With hedging on (`<PREFIX>_HEDGE`,
+    only for idempotent calls), a request still pending after the recent
+    p95 gets a duplicate and the first good response wins.
+    """
+
+    def __init__(self, name: str, env_prefix: str, timeout: float, connect_timeout: float = 5.0,
+                 max_connections: int = 20, max_keepalive: int = 10, deadline: Optional[float] = None,
+                 breaker_p95: float = 3.0, hedge: bool = False):
+        self.name = name
+        self.timeout = float(os.getenv(f"{env_prefix}_TIMEOUT_SECONDS", str(timeout)))
+        self.deadline = float(os.getenv(f"{env_prefix}_DEADLINE_SECONDS", str(deadline or timeout)))
+        self.hedge = os.getenv(f"{env_prefix}_HEDGE", "1" if hedge else "0") != "0"
+        self.breaker = CircuitBreaker(
+            name,
+            error_rate=float(os.getenv(f"{env_prefix}_BREAKER_ERROR_RATE", "0.5")),
+            p95_seconds=float(os.getenv(f"{env_prefix}_BREAKER_P95_SECONDS", str(breaker_p95))),
+            cooldown_seconds=float(os.getenv(f"{env_prefix}_BREAKER_COOLDOWN_SECONDS", "30")),
+        )
+        self.connect_timeout = float(os.getenv(f"{env_prefix}_CONNECT_TIMEOUT_SECONDS", str(connect_timeout)))
+        self.max_connections = int(os.getenv(f"{env_prefix}_MAX_CONNECTIONS", str(max_connections)))
+        self.max_keepalive = int(os.getenv(f"{env_prefix}_MAX_KEEPALIVE", str(max_keepalive)))
+        self.http2 = HTTP2_ENABLED and _HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+        logger.info(
+            "upstream.started name=%s http2=%s max_connections=%s timeout=%s",
+            self.name, self.http2, self.max_connections, self.timeout,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST over the shared pool; raises httpx.HTTPError like AsyncClient.post.
+
+        Raises CircuitOpenError at once while the breaker is open, and
+        httpx.TimeoutException once the deadline passes.
+        """
+        if self._client is None:
+            # Outside the app lifespan (scripts, one-off calls) open the pool on first use
+            self.start()
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+        self.requests += 1
+        try:
+            return await asyncio.wait_for(self._hedged(url, kwargs), self.deadline)
+        except asyncio.TimeoutError as exc:
+            self.errors += 1
+            self.breaker.record(False, self.deadline)
+            raise httpx.TimeoutException(f"{self.name} deadline of {self.deadline}s exceeded") from exc
+
+    async def _hedged(self, url: str, kwargs: dict) -> httpx.Response:
+        hedge_after = self.breaker.hedge_delay() if self.hedge else None
+        tasks = [asyncio.ensure_future(self._send(url, kwargs))]
+        try:
+            if hedge_after is None:
+                return await tasks[0]
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return tasks[0].result()
+
+            self.hedges += 1
+            tasks.append(asyncio.ensure_future(self._send(url, kwargs)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not _failed(task.result()):
+                        if task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both attempts failed: surface the original request's outcome
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send(self, url: str, kwargs: dict) -> httpx.Response:
+        started = time.perf_counter()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._client.post(url, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            self.breaker.record(False, time.perf_counter() - started)
+            raise
+        finally:
+            self.in_flight -= 1
+        # A hedge loser is cancelled before reaching here, so only completed attempts are recorded
+        self.breaker.record(not _failed(response), time.perf_counter() - started)
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "open": self._client is not None,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            # Over HTTP/2 several requests share one connection, so this is an upper bound
+            "peak_utilization": round(self.peak_in_flight / self.max_connections, 4) if self.max_connections else 0.0,
+            "requests": self.requests,
+            "errors": self.errors,
+            "deadline_seconds": self.deadline,
+            "hedging": self.hedge,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "breaker": self.breaker.stats(),
+        }
+
+
+# Generation is slow and not idempotent: generous latency threshold, no hedging
+gemini_client = UpstreamClient("gemini", "GEMINI", timeout=30, breaker_p95=20.0)
+# Routing has a cheap local fallback, so fail fast and hedge the tail
+openroute_client = UpstreamClient("openroute", "OPENROUTE", timeout=15, deadline=4.0, breaker_p95=2.5, hedge=True)
+
+UPSTREAMS = (gemini_client, openroute_client)
+
+
+def start_upstreams() -> None:
+    for upstream in UPSTREAMS:
+        upstream.start()
+
+
+async def close_upstreams() -> None:
+    for upstream in UPSTREAMS:
+        await upstream.aclose()
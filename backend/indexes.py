@@ -0,0 +1,77 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import logging
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger("savour.indexes")
+
+# Declarative index registry: collection name -> indexes it must have.
+# create_indexes() is a no-op for indexes that already exist with the same spec.
+INDEXES = {
+    "categories": [
+        IndexModel([("category_id", ASCENDING)], name="category_id_unique", unique=True),
+        IndexModel([("sort_order", ASCENDING)], name="sort_order"),
+    ],
+    "stores": [
+        IndexModel([("store_id", ASCENDING)], name="store_id_unique", unique=True),
+    ],
+    "metadata": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+    ],
+}
+
+# Hot queries that must be served by an index: (collection, filter, sort)
+HOT_QUERIES = [
+    ("categories", {"category_id": "milk-2"}, None),
+    ("categories", {"category_id": {"$in": ["milk-2", "bananas"]}}, None),
+    ("categories", {}, [("sort_order", ASCENDING)]),
+    ("stores", {"store_id": "maxi"}, None),
+    ("metadata", {"key": "prices"}, None),
+]
+
+
+def apply_indexes(db) -> dict[str, list[str]]:
+    """Create every registered index with a synchronous pymongo database.
+
+    Returns the index names per collection; a collection that fails is
+    logged and left out so the others still get their indexes.
+    """
+    created = {}
+    for name, models in INDEXES.items():
+        try:
+            created[name] = db[name].create_indexes(models)
+        except PyMongoError as exc:
+            logger.exception("indexes.create_failed collection=%s error=%s", name, exc)
+    return created
+
+
+async def ensure_indexes(db) -> None:
+    """Create every registered index with a Motor database (used at API startup)."""
+    for name, models in INDEXES.items():
+        try:
+            created = await db[name].create_indexes(models)
+        except PyMongoError as exc:
+            logger.exception("indexes.create_failed collection=%s error=%s", name, exc)
+            continue
+        logger.info("indexes.ensured collection=%s indexes=%s", name, ",".join(created))
+
+
+def plan_stages(plan) -> list[str]:
+    """Flatten every `stage` name found in an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
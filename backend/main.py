@@ -7,26 +7,44 @@ via any medium, is strictly prohibited without express written permission from S
 """
 
 import os
+import json
+import math
 import time
+import hashlib
+import asyncio
+import bisect
 import logging
-from typing import Any
+from contextlib import asynccontextmanager, suppress
+from typing import Any, Literal, Optional
 import httpx
-from fastapi import FastAPI, HTTPException, Query
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from database import stores_collection, categories_collection, metadata_collection
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from database import db
+from indexes import ensure_indexes
+from catalog import catalog, CATALOG_POLL_SECONDS
+from search_index import SUGGEST_TOP_K
+from http_cache import cached_json_response
+from caching import LRUTTLCache
+from route_cache import RouteCache
+from circuit_breaker import CircuitOpenError
+from http_clients import UPSTREAMS, gemini_client, openroute_client, start_upstreams, close_upstreams
+from pricing import BasketQuote, BasketSession, StoreSubsetOptimizer
+import polyline
+from road_network import NoRoute, estimate_legs, load_road_network
+from routing import (
+    AVERAGE_SPEED_KMH, MAX_EXACT_STOPS, ROAD_DISTANCE_FACTOR, TourTable, haversine_km
+)
 from models import (
-    Store, StoresResponse, CategorySummary, CategoriesResponse,
-    PriceEntry, CategoryDetail, BasketRequest, BasketAnalysis,
-    StoreTotal, MultiStoreItem, DealInfo,
+    Store, StoresResponse, CategorySummary, CategoriesResponse, SuggestResponse, Suggestion,
+    PriceEntry, CategoryDetail, BasketRequest, BasketAnalysis, BasketDelta,
+    BatchBasketRequest, BatchBasketResponse,
+    StoreTotal, MultiStoreItem, DealInfo, LimitedStorePlan, StoreCountPoint,
     RecipeGenerateRequest, RecipeGenerateResponse, RetrievedItem,
     RouteOptimizeRequest, RouteOptimizeResponse, StoreWithLocation,
-    StoreVisit, TravelCost, Location
-)
-
-app = FastAPI(
-    title="InflationFighter API",
-    description="Grocery price comparison API for Canadian shoppers",
-    version="1.0.0"
+    StoreVisit, TravelCost, Location, RouteSettings
 )
 
 logging.basicConfig(
@@ -35,6 +53,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger("savour")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the catalog snapshot once, then keep it fresh in the background."""
+    try:
+        await ensure_indexes(db)
+    except Exception as exc:
+        logger.exception("indexes.ensure_failed error=%s", exc)
+    try:
+        await catalog.refresh(force=True)
+    except Exception as exc:
+        # The poller keeps retrying; handlers answer 503 until the first load lands.
+        logger.exception("catalog.initial_load_failed error=%s", exc)
+    # Warm connection pools for Gemini and OpenRouteService, shared by every request
+    start_upstreams()
+    # Offline road graph (ROAD_GRAPH_PATH); routes go to ORS while it is absent
+    global road_network
+    road_network = await asyncio.to_thread(load_road_network)
+    tasks = [
+        asyncio.create_task(catalog.poll_forever(CATALOG_POLL_SECONDS)),
+        asyncio.create_task(catalog.expire_deals_forever()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    route_cache.close()
+    await close_upstreams()
+
+
+app = FastAPI(
+    title="InflationFighter API",
+    description="Grocery price comparison API for Canadian shoppers",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -47,8 +104,23 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.0-flash"
 GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
 
+NDJSON_BATCH_SIZE = 200
+
+basket_cache = LRUTTLCache(
+    maxsize=int(os.getenv("BASKET_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("BASKET_CACHE_TTL_SECONDS", "300"))
+)
+# Keys already include the catalog version; clearing on reload just frees the stale entries early
+catalog.subscribe(lambda snapshot: basket_cache.clear())
+
 OPENROUTE_API_KEY = os.getenv("OPENROUTE_API_KEY", "")
-OPENROUTE_URL = "https://api.openrouteservice.org/v2/directions/driving-car"
+OPENROUTE_URL = os.getenv("OPENROUTE_URL", "https://api.openrouteservice.org/v2/directions/driving-car")
+
+# Map zoom each route_polyline detail level is simplified for: city overview vs street level
+ROUTE_DETAIL_ZOOM = {"low": 12, "high": 16}
+
+route_cache = RouteCache()
+road_network = None
 
 
 @app.get("/")
@@ -58,115 +130,155 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "catalog_loaded": catalog.loaded,
+        "catalog_version": catalog.snapshot.version if catalog.loaded else None,
+        "caches": {
+            "basket_analysis": basket_cache.stats(),
+            "routes": route_cache.stats()
+        },
+        "upstreams": {upstream.name: upstream.stats() for upstream in UPSTREAMS},
+        "road_network": {"loaded": road_network is not None,
+                         "nodes": road_network.node_count if road_network is not None else 0}
+    }
 
 
 @app.get("/api/metadata")
-async def get_metadata():
+async def get_metadata(request: Request):
     """Get metadata including last_updated timestamp for prices."""
-    meta = await metadata_collection.find_one({"key": "prices"})
-    if meta:
-        return {
-            "last_updated": meta.get("last_updated"),
-            "source": meta.get("source")
-        }
-    return {"last_updated": None, "source": None}
+    snapshot = catalog.snapshot
+    return await cached_json_response(request, "metadata", snapshot.version, lambda: snapshot.metadata)
 
 
 @app.get("/api/stores", response_model=StoresResponse)
-async def get_stores():
-    stores = await stores_collection.find({}).to_list(100)
-    return {"stores": [Store(**s) for s in stores]}
+async def get_stores(request: Request):
+    snapshot = catalog.snapshot
+    return await cached_json_response(
+        request, "stores", snapshot.version,
+        lambda: StoresResponse(stores=[Store(**s) for s in snapshot.stores])
+    )
 
 
-@app.get("/api/categories", response_model=CategoriesResponse)
-async def get_categories():
-    categories = await categories_collection.find({}).sort("sort_order", 1).to_list(1500)
-    stores = {s["store_id"]: s for s in await stores_collection.find({}).to_list(100)}
+def _category_summary(cat: dict) -> CategorySummary:
+    """Build a CategorySummary from the fields materialized at write time."""
+    return CategorySummary(
+        category_id=cat["category_id"],
+        name=cat["name"],
+        icon=cat.get("icon", ""),
+        unit=cat.get("unit", ""),
+        image_url=cat.get("image_url"),
+        cheapest_store=cat["cheapest_store"],
+        cheapest_price=cat["cheapest_price"],
+        most_expensive_price=cat["most_expensive_price"],
+        savings_percent=cat["savings_percent"],
+        previous_price=cat.get("previous_price")
+    )
 
-    result = []
-    for cat in categories:
-        prices = cat.get("prices", {})
-        if not prices:
-            continue
 
-        sorted_prices = sorted(prices.items(), key=lambda x: x[1])
-        cheapest_store_id, cheapest_price = sorted_prices[0]
-        _, most_expensive_price = sorted_prices[-1]
-        savings_percent = round((1 - cheapest_price / most_expensive_price) * 100) if most_expensive_price > 0 else 0
+async def _iter_ndjson(categories: list[dict]):
+    """Serialize summaries one line at a time, flushing every NDJSON_BATCH_SIZE rows."""
+    for start in range(0, len(categories), NDJSON_BATCH_SIZE):
+        batch = categories[start:start + NDJSON_BATCH_SIZE]
+        yield "".join(_category_summary(c).model_dump_json() + "\n" for c in batch)
+        # Let other requests run between batches on large exports
+        await asyncio.sleep(0)
 
-        result.append(CategorySummary(
-            category_id=cat["category_id"],
-            name=cat["name"],
-            icon=cat.get("icon", ""),
-            unit=cat.get("unit", ""),
-            image_url=cat.get("image_url"),
-            cheapest_store=cheapest_store_id,
-            cheapest_price=cheapest_price,
-            most_expensive_price=most_expensive_price,
-            savings_percent=savings_percent,
-            previous_price=cat.get("previous_price")
-        ))
 
-    return {"categories": result}
+def _ndjson_response(snapshot) -> StreamingResponse:
+    return StreamingResponse(
+        _iter_ndjson(snapshot.listed),
+        media_type="application/x-ndjson",
+        headers={"X-Catalog-Version": snapshot.version or ""}
+    )
+
+
+def _parse_fields(fields: str) -> list[str]:
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in CategorySummary.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+@app.get("/api/categories", response_model=CategoriesResponse)
+async def get_categories(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[int] = Query(None, description="sort_order of the last item on the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated CategorySummary fields to return")
+):
+    snapshot = catalog.snapshot
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return _ndjson_response(snapshot)
+
+    if limit is None and after is None and fields is None:
+        return await cached_json_response(
+            request, "categories", snapshot.version,
+            lambda: CategoriesResponse(categories=[_category_summary(c) for c in snapshot.listed])
+        )
+
+    # Keyset page: binary search the sort_order cursor, then slice only what the page needs
+    start = bisect.bisect_right(snapshot.listed_keys, after) if after is not None else 0
+    end = len(snapshot.listed) if limit is None else min(start + limit, len(snapshot.listed))
+    page = snapshot.listed[start:end]
+    next_cursor = snapshot.listed_keys[end - 1] if page and end < len(snapshot.listed) else None
+
+    if fields is None:
+        categories = [_category_summary(c).model_dump() for c in page]
+    else:
+        selected = _parse_fields(fields)
+        categories = [_category_summary(c).model_dump(include=set(selected)) for c in page]
+
+    return JSONResponse({"categories": categories, "next_cursor": next_cursor})
 
 
 @app.get("/api/categories/search", response_model=CategoriesResponse)
 async def search_categories(q: str = Query(..., min_length=1)):
-    categories = await categories_collection.find({
-        "$or": [
-            {"name": {"$regex": q, "$options": "i"}},
-            {"search_terms": {"$regex": q, "$options": "i"}}
-        ]
-    }).to_list(100)
+    categories = catalog.snapshot.search_index.search(q, limit=100)
+    return {"categories": [_category_summary(c) for c in categories]}
 
-    stores = {s["store_id"]: s for s in await stores_collection.find({}).to_list(100)}
-
-    result = []
-    for cat in categories:
-        prices = cat.get("prices", {})
-        if not prices:
-            continue
 
-        sorted_prices = sorted(prices.items(), key=lambda x: x[1])
-        cheapest_store_id, cheapest_price = sorted_prices[0]
-        _, most_expensive_price = sorted_prices[-1]
-        savings_percent = round((1 - cheapest_price / most_expensive_price) * 100) if most_expensive_price > 0 else 0
+@app.get("/api/categories/suggest", response_model=SuggestResponse)
+async def suggest_categories(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(SUGGEST_TOP_K, ge=1, le=SUGGEST_TOP_K)
+):
+    """Typeahead completions served from the precomputed trie."""
+    matches = catalog.snapshot.suggest_trie.suggest(prefix, limit)
+    return SuggestResponse(suggestions=[
+        Suggestion(category_id=c["category_id"], name=c["name"], cheapest_price=c["cheapest_price"])
+        for c in matches
+    ])
 
-        result.append(CategorySummary(
-            category_id=cat["category_id"],
-            name=cat["name"],
-            icon=cat.get("icon", ""),
-            unit=cat.get("unit", ""),
-            image_url=cat.get("image_url"),
-            cheapest_store=cheapest_store_id,
-            cheapest_price=cheapest_price,
-            most_expensive_price=most_expensive_price,
-            savings_percent=savings_percent,
-            previous_price=cat.get("previous_price")
-        ))
 
-    return {"categories": result}
+@app.get("/api/categories/stream")
+async def stream_categories():
+    """Full catalog export as newline-delimited CategorySummary JSON."""
+    return _ndjson_response(catalog.snapshot)
 
 
 @app.get("/api/categories/{category_id}", response_model=CategoryDetail)
 async def get_category(category_id: str):
-    category = await categories_collection.find_one({"category_id": category_id})
+    snapshot = catalog.snapshot
+    category = snapshot.categories_by_id.get(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    stores = {s["store_id"]: s for s in await stores_collection.find({}).to_list(100)}
+    stores = snapshot.stores_by_id
+    matrix = snapshot.price_matrix
+    row = matrix.row_of[category_id]
 
     prices = category.get("prices", {})
     deals = category.get("deals", {})
 
     price_entries = []
     for store_id, price in prices.items():
-        deal_data = deals.get(store_id)
-        deal = DealInfo(**deal_data) if deal_data else None
-
-        # Use sale price for sorting if there's an active deal
-        effective_price = deal.sale_price if deal else price
+        # Effective price and deal status come from today's price table; expired deals are dropped
+        col = matrix.col_of.get(store_id)
+        active = col is not None and bool(matrix.active_deal[row, col])
+        deal = DealInfo(**deals[store_id]) if active else None
+        effective_price = float(matrix.prices[row, col]) if col is not None else price
 
         price_entries.append(PriceEntry(
             store_id=store_id,
@@ -193,105 +305,243 @@ async def get_category(category_id: str):
     )
 
 
-def get_effective_price(cat: dict, store_id: str) -> float:
-    """Get the effective price for a store, using deal price if available."""
-    prices = cat.get("prices", {})
-    deals = cat.get("deals", {})
-
-    base_price = prices.get(store_id, 0)
-    deal = deals.get(store_id)
-
-    if deal and "sale_price" in deal:
-        return deal["sale_price"]
-    return base_price
+MAX_BATCH_BASKETS = 500
 
 
-@app.post("/api/basket/analyze", response_model=BasketAnalysis)
-async def analyze_basket(request: BasketRequest):
-    if not request.items:
-        raise HTTPException(status_code=400, detail="Basket is empty")
-
-    stores_list = await stores_collection.find({}).to_list(100)
-    stores = {s["store_id"]: s for s in stores_list}
-
-    category_ids = [item.category_id for item in request.items]
-    categories = await categories_collection.find({"category_id": {"$in": category_ids}}).to_list(100)
-    categories_map = {c["category_id"]: c for c in categories}
-
-    # Calculate totals per store (using effective prices with deals)
-    store_totals = {}
-    for store_id, store in stores.items():
-        total = 0
-        for item in request.items:
-            cat = categories_map.get(item.category_id)
-            if cat and store_id in cat.get("prices", {}):
-                effective_price = get_effective_price(cat, store_id)
-                total += effective_price * item.quantity
-        store_totals[store_id] = StoreTotal(
+def _multi_store_items(snapshot, assignments) -> list[MultiStoreItem]:
+    """MultiStoreItem rows for (item, store_id, price) assignments."""
+    stores = snapshot.stores_by_id
+    return [
+        MultiStoreItem(
+            category_id=item.category_id,
+            name=snapshot.categories_by_id[item.category_id]["name"],
             store_id=store_id,
-            store_name=store["name"],
-            total=round(total, 2),
-            color=store["color"]
+            store_name=stores[store_id]["name"],
+            price=price,
+            quantity=item.quantity,
+            color=stores[store_id]["color"],
+            substituted_for=getattr(item, "substituted_for", None)
         )
+        for item, store_id, price in assignments
+    ]
 
-    sorted_stores = sorted(store_totals.values(), key=lambda x: x.total)
-    single_store_best = sorted_stores[0]
-    single_store_worst = sorted_stores[-1]
-
-    # Multi-store optimal (using effective prices with deals)
-    multi_store_items = []
-    multi_store_total = 0
 
-    for item in request.items:
-        cat = categories_map.get(item.category_id)
-        if not cat:
-            continue
+def _validate_max_stores(max_stores: Optional[int]) -> None:
+    if max_stores is not None and max_stores < 1:
+        raise HTTPException(status_code=400, detail="max_stores must be at least 1")
 
-        prices = cat.get("prices", {})
-        deals = cat.get("deals", {})
-        if not prices:
-            continue
 
-        # Find cheapest store considering deals
-        cheapest_store_id = None
-        cheapest_price = float('inf')
+def _store_count_fields(snapshot, quote: BasketQuote, max_stores: int, worst_total: float) -> dict:
+    """Exact at-most-k-stores plan and the stores-visited vs. total frontier."""
+    optimizer = StoreSubsetOptimizer(quote)
+    frontier = [
+        StoreCountPoint(store_count=size, store_ids=store_ids, total=round(total, 2))
+        for size, total, store_ids in optimizer.frontier()
+    ]
+    mask = optimizer.best_mask(max_stores)
+    plan = None
+    if mask is not None:
+        total = round(optimizer.costs[mask], 2)
+        plan = LimitedStorePlan(
+            max_stores=max_stores,
+            store_ids=optimizer.store_ids_for(mask),
+            items=_multi_store_items(snapshot, optimizer.assignments(mask)),
+            total=total,
+            savings_vs_worst=round(worst_total - total, 2),
+        )
+    return {"limited_store_plan": plan, "store_count_frontier": frontier}
 
-        for store_id in prices:
-            effective_price = get_effective_price(cat, store_id)
-            if effective_price < cheapest_price:
-                cheapest_price = effective_price
-                cheapest_store_id = store_id
 
-        if not cheapest_store_id:
-            continue
+def _build_basket_analysis(snapshot, quote: BasketQuote, max_stores: Optional[int] = None) -> BasketAnalysis:
+    """Assemble a BasketAnalysis from a priced basket."""
+    stores = snapshot.stores_by_id
+    store_totals = [
+        StoreTotal(
+            store_id=store_id,
+            store_name=stores[store_id]["name"],
+            total=round(total, 2),
+            color=stores[store_id]["color"]
+        )
+        for store_id, total in quote.store_totals.items()
+    ]
 
-        multi_store_items.append(MultiStoreItem(
-            category_id=item.category_id,
-            name=cat["name"],
-            store_id=cheapest_store_id,
-            store_name=stores[cheapest_store_id]["name"],
-            price=cheapest_price,
-            quantity=item.quantity,
-            color=stores[cheapest_store_id]["color"]
-        ))
-        multi_store_total += cheapest_price * item.quantity
+    sorted_stores = sorted(store_totals, key=lambda x: x.total)
+    single_store_best = sorted_stores[0]
+    single_store_worst = sorted_stores[-1]
 
-    multi_store_total = round(multi_store_total, 2)
+    multi_store_total = round(quote.multi_store_total, 2)
     savings_vs_worst = round(single_store_worst.total - multi_store_total, 2)
     savings_percent = round((savings_vs_worst / single_store_worst.total) * 100) if single_store_worst.total > 0 else 0
     annual_projection = round(savings_vs_worst * 52, 2)
 
+    extra = _store_count_fields(snapshot, quote, max_stores, single_store_worst.total) if max_stores else {}
     return BasketAnalysis(
         single_store_best=single_store_best,
         single_store_worst=single_store_worst,
-        multi_store_optimal=multi_store_items,
+        multi_store_optimal=_multi_store_items(snapshot, quote.assignments),
         multi_store_total=multi_store_total,
         savings_vs_worst=savings_vs_worst,
         savings_percent=savings_percent,
-        annual_projection=annual_projection
+        annual_projection=annual_projection,
+        **extra
     )
 
 
+def _basket_cache_key(version, request: BasketRequest) -> str:
+    """Canonical hash of the sorted (category_id, quantity) pairs, options and the catalog price version."""
+    pairs = sorted((item.category_id, item.quantity) for item in request.items)
+    options = [request.max_stores, request.allow_substitutes]
+    return hashlib.sha256(json.dumps([version, pairs, options]).encode()).hexdigest()
+
+
+def _reorder_entries(entries: list[MultiStoreItem], items) -> list[MultiStoreItem]:
+    queues: dict[tuple[str, int], list[MultiStoreItem]] = {}
+    for entry in entries:
+        requested = entry.substituted_for or entry.category_id
+        queues.setdefault((requested, entry.quantity), []).append(entry)
+    ordered = []
+    for item in items:
+        queue = queues.get((item.category_id, item.quantity))
+        if queue:
+            ordered.append(queue.pop(0))
+    return ordered
+
+
+def _in_request_order(analysis: BasketAnalysis, items) -> BasketAnalysis:
+    """Reorder a cached analysis's per-item lists to follow this request's item order."""
+    update = {}
+    ordered = _reorder_entries(analysis.multi_store_optimal, items)
+    if ordered != analysis.multi_store_optimal:
+        update["multi_store_optimal"] = ordered
+    plan = analysis.limited_store_plan
+    if plan is not None:
+        plan_items = _reorder_entries(plan.items, items)
+        if plan_items != plan.items:
+            update["limited_store_plan"] = plan.model_copy(update={"items": plan_items})
+    return analysis.model_copy(update=update) if update else analysis
+
+
+@app.post("/api/basket/analyze", response_model=BasketAnalysis)
+async def analyze_basket(request: BasketRequest):
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Basket is empty")
+    _validate_max_stores(request.max_stores)
+
+    snapshot = catalog.snapshot
+    cache_key = _basket_cache_key(snapshot.price_version, request)
+    cached = basket_cache.get(cache_key)
+    if cached is not None:
+        return _in_request_order(cached, request.items)
+
+    matrix = snapshot.price_matrix.substitutes if request.allow_substitutes else snapshot.price_matrix
+    analysis = _build_basket_analysis(snapshot, matrix.quote(request.items), request.max_stores)
+    basket_cache.set(cache_key, analysis)
+    return analysis
+
+
+@app.post("/api/basket/analyze/batch", response_model=BatchBasketResponse)
+async def analyze_baskets(request: BatchBasketRequest):
+    """Analyze many baskets against one shared slice of the price matrix."""
+    if not request.baskets:
+        raise HTTPException(status_code=400, detail="No baskets provided")
+    if len(request.baskets) > MAX_BATCH_BASKETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_BASKETS} baskets per request")
+    for i, basket in enumerate(request.baskets):
+        if not basket.items:
+            raise HTTPException(status_code=400, detail=f"Basket {i} is empty")
+        _validate_max_stores(basket.max_stores)
+
+    snapshot = catalog.snapshot
+    # Baskets with and without substitution price against different views of the matrix
+    quotes = [None] * len(request.baskets)
+    for allow in (False, True):
+        indices = [i for i, basket in enumerate(request.baskets) if basket.allow_substitutes == allow]
+        if not indices:
+            continue
+        matrix = snapshot.price_matrix.substitutes if allow else snapshot.price_matrix
+        for i, quote in zip(indices, matrix.quote_many([request.baskets[i].items for i in indices])):
+            quotes[i] = quote
+    results = [
+        _build_basket_analysis(snapshot, quote, basket.max_stores)
+        for basket, quote in zip(request.baskets, quotes)
+    ]
+    return BatchBasketResponse(results=results)
+
+
+def _apply_delta(session: BasketSession, delta: BasketDelta) -> Optional[str]:
+    """Apply one basket edit; returns an error message instead of raising."""
+    if delta.op == "clear":
+        for category_id in list(session.lines):
+            session.set(category_id, 0)
+        return None
+    if delta.category_id not in session.matrix.row_of:
+        return f"Unknown category_id: {delta.category_id}"
+    current = session.lines.get(delta.category_id, 0)
+    if delta.op == "remove":
+        session.set(delta.category_id, 0)
+    elif delta.op == "add":
+        if delta.quantity < 1:
+            return "quantity must be at least 1"
+        session.set(delta.category_id, current + delta.quantity)
+    else:
+        if delta.quantity < 0:
+            return "quantity cannot be negative"
+        session.set(delta.category_id, delta.quantity)
+    return None
+
+
+@app.websocket("/ws/basket")
+async def basket_session(websocket: WebSocket, allow_substitutes: bool = False, max_stores: Optional[int] = None):
+    """Server-side basket: each message is one BasketDelta, each reply the updated analysis.
+
+    Replies are {"type": "analysis", "analysis": BasketAnalysis | null} (null
+    while the basket is empty) or {"type": "error", "detail": str}.
+    """
+    await websocket.accept()
+    if max_stores is not None and max_stores < 1:
+        await websocket.send_json({"type": "error", "detail": "max_stores must be at least 1"})
+        await websocket.close(code=1008)
+        return
+    if not catalog.loaded:
+        await websocket.send_json({"type": "error", "detail": "Catalog not loaded yet"})
+        await websocket.close(code=1013)
+        return
+
+    def current_matrix(snapshot):
+        return snapshot.price_matrix.substitutes if allow_substitutes else snapshot.price_matrix
+
+    session = BasketSession(current_matrix(catalog.snapshot))
+    updates = 0
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                delta = BasketDelta.model_validate_json(message)
+            except ValidationError as exc:
+                await websocket.send_json({"type": "error", "detail": exc.errors(include_url=False)})
+                continue
+
+            snapshot = catalog.snapshot
+            matrix = current_matrix(snapshot)
+            if session.matrix is not matrix:
+                # Prices changed under the session: reprice every line once
+                session.rebuild(matrix)
+
+            error = _apply_delta(session, delta)
+            if error:
+                await websocket.send_json({"type": "error", "detail": error})
+                continue
+
+            updates += 1
+            analysis = _build_basket_analysis(snapshot, session.quote(), max_stores) if session.lines else None
+            await websocket.send_json({
+                "type": "analysis",
+                "analysis": analysis.model_dump() if analysis else None,
+            })
+    except WebSocketDisconnect:
+        logger.info("basket_session.closed updates=%s lines=%s", updates, len(session.lines))
+
+
 def _normalize_terms(values: list[str]) -> list[str]:
     seen = set()
     cleaned = []
@@ -306,9 +556,12 @@ def _normalize_terms(values: list[str]) -> list[str]:
 
 async def _retrieve_rag_items(request: RecipeGenerateRequest) -> list[RetrievedItem]:
     t0 = time.perf_counter()
-    query = {}
+    snapshot = catalog.snapshot
+    stores = snapshot.stores_by_id
     if request.category_ids:
-        query = {"category_id": {"$in": request.category_ids}}
+        wanted = dict.fromkeys(request.category_ids)
+        categories = [snapshot.categories_by_id[cid] for cid in wanted if cid in snapshot.categories_by_id]
+        logger.info("recipe.rag.query category_ids=%s", len(wanted))
     else:
         terms = _normalize_terms(request.ingredients)
         if request.cuisine:
@@ -316,16 +569,17 @@ async def _retrieve_rag_items(request: RecipeGenerateRequest) -> list[RetrievedI
         if request.meal_type:
             terms.extend(_normalize_terms([request.meal_type]))
 
+        logger.info("recipe.rag.query terms=%s", terms)
         if terms:
-            or_filters = []
+            # Union of per-term hits, keeping each term's ranking order
+            matched = {}
             for term in terms:
-                or_filters.append({"name": {"$regex": term, "$options": "i"}})
-                or_filters.append({"search_terms": {"$regex": term, "$options": "i"}})
-            query = {"$or": or_filters}
-
-    logger.info("recipe.rag.query built %s", query or {})
-    categories = await categories_collection.find(query).to_list(200)
-    stores = {s["store_id"]: s for s in await stores_collection.find({}).to_list(100)}
+                for cat in snapshot.search_index.search(term, limit=200):
+                    matched.setdefault(cat["category_id"], cat)
+            categories = list(matched.values())
+        else:
+            categories = snapshot.categories
+    categories = categories[:200]
 
     retrieved = []
     for cat in categories:
@@ -335,8 +589,10 @@ async def _retrieve_rag_items(request: RecipeGenerateRequest) -> list[RetrievedI
 
         cheapest_store_id = min(prices, key=lambda x: prices[x])
         cheapest_price = prices[cheapest_store_id]
-        deal_data = cat.get("deals", {}).get(cheapest_store_id)
-        deal = DealInfo(**deal_data) if deal_data else None
+        row = snapshot.price_matrix.row_of[cat["category_id"]]
+        col = snapshot.price_matrix.col_of.get(cheapest_store_id)
+        active = col is not None and bool(snapshot.price_matrix.active_deal[row, col])
+        deal = DealInfo(**cat["deals"][cheapest_store_id]) if active else None
 
         retrieved.append(RetrievedItem(
             category_id=cat["category_id"],
@@ -424,16 +680,18 @@ async def _call_gemini(prompt: str) -> str:
         }
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            response = await client.post(
-                GEMINI_URL,
-                params={"key": GEMINI_API_KEY},
-                json=payload
-            )
-        except httpx.HTTPError as exc:
-            logger.exception("recipe.gemini.http_error duration_ms=%s error=%s", round((time.perf_counter() - t0) * 1000, 1), exc)
-            raise HTTPException(status_code=502, detail="Gemini API request failed") from exc
+    try:
+        response = await gemini_client.post(
+            GEMINI_URL,
+            params={"key": GEMINI_API_KEY},
+            json=payload
+        )
+    except CircuitOpenError as exc:
+        logger.warning("recipe.gemini.circuit_open error=%s", exc)
+        raise HTTPException(status_code=503, detail="Gemini API temporarily unavailable") from exc
+    except httpx.HTTPError as exc:
+        logger.exception("recipe.gemini.http_error duration_ms=%s error=%s", round((time.perf_counter() - t0) * 1000, 1), exc)
+        raise HTTPException(status_code=502, detail="Gemini API request failed") from exc
 
     if response.status_code >= 400:
         logger.error(
@@ -493,40 +751,10 @@ async def generate_recipe(request: RecipeGenerateRequest):
 
 # --- Route Optimization ---
 
-async def _get_stores_with_locations() -> dict[str, StoreWithLocation]:
-    """Fetch stores that have location data.
-
-    Returns the first location for each store chain (for price lookups and route optimization).
-    The route optimizer will pick the closest location from user's position.
-    """
-    stores = await stores_collection.find({}).to_list(100)
-    result = {}
-    for s in stores:
-        # Handle new multi-location format
-        locations = s.get("locations", [])
-        if locations:
-            # Use first location as representative for this chain
-            first_loc = locations[0]
-            result[s["store_id"]] = StoreWithLocation(
-                store_id=s["store_id"],
-                location_id=first_loc.get("location_id"),
-                name=s["name"],
-                color=s["color"],
-                address=first_loc.get("address", ""),
-                lat=first_loc["lat"],
-                lng=first_loc["lng"]
-            )
-        # Fallback for old single-location format
-        elif "lat" in s and "lng" in s:
-            result[s["store_id"]] = StoreWithLocation(
-                store_id=s["store_id"],
-                name=s["name"],
-                color=s["color"],
-                address=s.get("address", ""),
-                lat=s["lat"],
-                lng=s["lng"]
-            )
-    return result
+def _get_stores_with_locations(user_location: Location) -> dict[str, StoreWithLocation]:
+    """Each chain's location nearest the user (KD-tree lookup), keyed by store_id."""
+    nearest = catalog.snapshot.location_index.nearest_per_chain(user_location.lat, user_location.lng)
+    return {store_id: StoreWithLocation(**loc) for store_id, loc in nearest.items()}
 
 
 async def _call_openroute(coordinates: list[list[float]]) -> dict:
@@ -544,19 +772,21 @@ async def _call_openroute(coordinates: list[list[float]]) -> dict:
         "preference": "fastest"
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            response = await client.post(
-                OPENROUTE_URL,
-                headers={
-                    "Authorization": OPENROUTE_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json=payload
-            )
-        except httpx.HTTPError as exc:
-            logger.exception("openroute.http_error error=%s", exc)
-            raise HTTPException(status_code=502, detail="OpenRouteService request failed") from exc
+    try:
+        response = await openroute_client.post(
+            OPENROUTE_URL,
+            headers={
+                "Authorization": OPENROUTE_API_KEY,
+                "Content-Type": "application/json"
+            },
+            json=payload
+        )
+    except CircuitOpenError as exc:
+        logger.warning("openroute.circuit_open error=%s", exc)
+        raise HTTPException(status_code=503, detail="OpenRouteService temporarily unavailable") from exc
+    except httpx.HTTPError as exc:
+        logger.exception("openroute.http_error error=%s", exc)
+        raise HTTPException(status_code=502, detail="OpenRouteService request failed") from exc
 
     if response.status_code >= 400:
         logger.error("openroute.error status=%s body=%s", response.status_code, response.text[:500])
@@ -565,80 +795,167 @@ async def _call_openroute(coordinates: list[list[float]]) -> dict:
     return response.json()
 
 
-def _calculate_optimal_route_order(
-    user_loc: Location,
-    store_locations: dict[str, StoreWithLocation],
-    stores_to_visit: set[str]
-) -> list[str]:
-    """
-    Calculate optimal visiting order using nearest neighbor heuristic.
-    For small number of stores (<=5), this is efficient enough.
+def _route_polylines(points: list[tuple[float, float]]) -> Optional[dict[str, str]]:
+    """Encoded geometry per detail level, simplified to about one pixel at that level's map zoom."""
+    if not points:
+        return None
+    lat = points[0][0]
+    return {
+        detail: polyline.encode(polyline.simplify(points, polyline.tolerance_for_zoom(zoom, lat)))
+        for detail, zoom in ROUTE_DETAIL_ZOOM.items()
+    }
+
+
+async def _route_summary(coordinates: list[list[float]]) -> dict:
+    """Distance (m), duration (s) and simplified polylines per detail level for a waypoint list.
+
+    Computed in-process from the offline road graph when one is loaded;
+    otherwise (or when the graph has no path) from ORS. Either way the
+    result, simplified geometries included, goes into the route cache.
     """
-    if len(stores_to_visit) <= 1:
-        return list(stores_to_visit)
+    cached = await route_cache.get(coordinates)
+    if cached is not None:
+        return cached
+
+    route = None
+    if road_network is not None:
+        try:
+            route = await asyncio.to_thread(road_network.route, [(lat, lng) for lng, lat in coordinates])
+        except NoRoute as exc:
+            logger.warning("road_network.no_route error=%s", exc)
+    if route is None:
+        route_data = (await _call_openroute(coordinates))["routes"][0]
+        geometry = route_data.get("geometry")
+        route = {
+            "distance": route_data["summary"]["distance"],
+            "duration": route_data["summary"]["duration"],
+            "geometry": polyline.decode(geometry) if geometry else [],
+        }
+
+    result = {
+        "distance": route["distance"],
+        "duration": route["duration"],
+        "polylines": await asyncio.to_thread(_route_polylines, route["geometry"]),
+    }
+    await route_cache.set(coordinates, result)
+    return result
+
+
+def _travel_cost(distance_km: float, drive_minutes: float, store_count: int, settings: RouteSettings) -> TravelCost:
+    """Gas plus time cost of a trip under the user's route settings."""
+    gas_cost = round(
+        (distance_km / 100) * settings.fuel_efficiency_l_per_100km * settings.gas_price_per_liter,
+        2
+    )
+    total_store_time = store_count * settings.time_per_store_minutes
+    total_trip_time = drive_minutes + total_store_time
+    time_cost = round(
+        (total_trip_time / 60) * settings.time_value_per_hour,
+        2
+    )
+    return TravelCost(
+        total_distance_km=distance_km,
+        total_drive_time_minutes=drive_minutes,
+        total_store_time_minutes=total_store_time,
+        total_trip_time_minutes=round(total_trip_time, 1),
+        gas_cost=gas_cost,
+        time_cost=time_cost,
+        total_travel_cost=round(gas_cost + time_cost, 2)
+    )
 
-    # Simple nearest neighbor algorithm
-    remaining = set(stores_to_visit)
-    order = []
-    current_lat, current_lng = user_loc.lat, user_loc.lng
 
-    while remaining:
-        nearest = None
-        nearest_dist = float('inf')
-        for store_id in remaining:
-            store = store_locations[store_id]
-            # Euclidean distance (good enough for ordering)
-            dist = ((store.lat - current_lat) ** 2 + (store.lng - current_lng) ** 2) ** 0.5
-            if dist < nearest_dist:
-                nearest_dist = dist
-                nearest = store_id
+async def _best_route_subset(
+    optimizer: StoreSubsetOptimizer,
+    store_locations: dict[str, StoreWithLocation],
+    user_loc: Location,
+    settings: RouteSettings,
+    single_store_best_total: float
+) -> tuple[int, list[str], float]:
+    """Store subset (two or more stores) with the highest estimated net savings, its order and that net.
+
+    Grocery cost per subset comes from the bitmask DP; travel comes from one
+    Held-Karp table over home plus the candidate stores, weighted by the gas
+    plus time cost of each leg, which gives the cheapest round trip of every
+    subset at once. Candidates are the located stores that appear in some
+    feasible subset, capped at MAX_EXACT_STOPS: the cheapest subset's stores
+    first, then the nearest to home. Legs are road-graph drive times and
+    distances when the graph is loaded, straight-line estimates otherwise.
+    """
+    home = (user_loc.lat, user_loc.lng)
+    usable = 0
+    for mask, cost in optimizer.costs.items():
+        if math.isfinite(cost):
+            usable |= mask
+    candidates = [
+        j for j, store_id in enumerate(optimizer.store_ids) if usable >> j & 1 and store_id in store_locations
+    ]
+    candidate_mask = sum(1 << j for j in candidates)
+    if len(candidates) > MAX_EXACT_STOPS:
+        # Keep the cheapest subset's stores so at least one subset stays scorable, then the nearest
+        cheapest = min(
+            (mask for mask, cost in optimizer.costs.items()
+             if bin(mask).count("1") >= 2 and math.isfinite(cost) and mask & candidate_mask == mask),
+            key=optimizer.costs.__getitem__,
+        )
 
-        order.append(nearest)
-        remaining.remove(nearest)
-        store = store_locations[nearest]
-        current_lat, current_lng = store.lat, store.lng
+        def rank(j: int) -> tuple[bool, float]:
+            store = store_locations[optimizer.store_ids[j]]
+            return not cheapest >> j & 1, haversine_km(home[0], home[1], store.lat, store.lng)
+        candidates = sorted(sorted(candidates, key=rank)[:MAX_EXACT_STOPS])
+    # Table node k + 1 is store column candidates[k]
+    node_bit = {j: 1 << k for k, j in enumerate(candidates)}
 
-    return order
+    points = [home] + [
+        (store_locations[optimizer.store_ids[j]].lat, store_locations[optimizer.store_ids[j]].lng) for j in candidates
+    ]
+    km, minutes = estimate_legs(points)
+    if road_network is not None:
+        road_km, road_minutes = await asyncio.to_thread(road_network.matrix, points)
+        # Keep the estimate for any pair the graph cannot connect
+        reachable = np.isfinite(road_minutes)
+        km = np.where(reachable, road_km, km)
+        minutes = np.where(reachable, road_minutes, minutes)
+    leg_costs = (
+        km / 100 * settings.fuel_efficiency_l_per_100km * settings.gas_price_per_liter
+        + minutes / 60 * settings.time_value_per_hour
+    )
+    tours = await asyncio.to_thread(TourTable, leg_costs)
+
+    best_mask, best_table_mask, best_net = None, 0, -math.inf
+    for mask, cost in optimizer.costs.items():
+        store_count = bin(mask).count("1")
+        if store_count < 2 or not math.isfinite(cost):
+            continue
+        table_mask = 0
+        for j in range(mask.bit_length()):
+            if mask >> j & 1:
+                table_mask |= node_bit.get(j, 0)
+        if bin(table_mask).count("1") != store_count:
+            continue  # Uses a store outside the candidates
+        store_time_cost = store_count * settings.time_per_store_minutes / 60 * settings.time_value_per_hour
+        net = single_store_best_total - cost - tours.length(table_mask) - store_time_cost
+        if net > best_net + 1e-9:
+            best_mask, best_table_mask, best_net = mask, table_mask, net
+    route_order = [optimizer.store_ids[candidates[node - 1]] for node in tours.order(best_table_mask)]
+    return best_mask, route_order, best_net
 
 
 @app.get("/api/stores/locations")
-async def get_store_locations():
+async def get_store_locations(request: Request):
     """Get all store locations for map display.
 
     Flattens multiple locations per chain into individual location entries.
     Each location includes store_id (chain), location_id, and coordinates.
     """
-    stores = await stores_collection.find({}).to_list(100)
-    result = []
-    for s in stores:
-        # Handle new multi-location format
-        locations = s.get("locations", [])
-        if locations:
-            for loc in locations:
-                result.append({
-                    "store_id": s["store_id"],
-                    "location_id": loc.get("location_id"),
-                    "name": s["name"],
-                    "color": s["color"],
-                    "address": loc.get("address", ""),
-                    "lat": loc["lat"],
-                    "lng": loc["lng"]
-                })
-        # Fallback for old single-location format
-        elif "lat" in s and "lng" in s:
-            result.append({
-                "store_id": s["store_id"],
-                "name": s["name"],
-                "color": s["color"],
-                "address": s.get("address", ""),
-                "lat": s["lat"],
-                "lng": s["lng"]
-            })
-    return {"stores": result}
+    snapshot = catalog.snapshot
+    return await cached_json_response(request, "store_locations", snapshot.version, lambda: {"stores": snapshot.locations})
 
 
 @app.post("/api/routes/optimize", response_model=RouteOptimizeResponse)
-async def optimize_route(request: RouteOptimizeRequest):
+async def optimize_route(
+    request: RouteOptimizeRequest,
+    detail: Literal["low", "high"] = Query("high", description="Route polyline resolution: low for overview maps")
+):
     """
     Optimize shopping route and calculate if multi-store shopping is worth it.
     """
@@ -646,75 +963,47 @@ async def optimize_route(request: RouteOptimizeRequest):
         raise HTTPException(status_code=400, detail="Basket is empty")
 
     # Get stores with locations
-    stores_with_loc = await _get_stores_with_locations()
+    stores_with_loc = _get_stores_with_locations(request.user_location)
     if not stores_with_loc:
         raise HTTPException(status_code=500, detail="No stores with location data found")
 
-    # Get all stores for price lookups (even ones without locations)
-    all_stores = {s["store_id"]: s for s in await stores_collection.find({}).to_list(100)}
-
-    # Get category data for basket items
-    category_ids = [item.category_id for item in request.items]
-    categories = await categories_collection.find({"category_id": {"$in": category_ids}}).to_list(100)
-    categories_map = {c["category_id"]: c for c in categories}
-
-    # Calculate single-store totals (using effective prices with deals)
-    store_totals = {}
-    for store_id in stores_with_loc:
-        total = 0
-        for item in request.items:
-            cat = categories_map.get(item.category_id)
-            if cat and store_id in cat.get("prices", {}):
-                effective_price = get_effective_price(cat, store_id)
-                total += effective_price * item.quantity
-        store_totals[store_id] = total
-
-    sorted_stores = sorted(store_totals.items(), key=lambda x: x[1])
+    # Same pricing core as analyze_basket, restricted to stores we can route to
+    snapshot = catalog.snapshot
+    quote = snapshot.price_matrix.quote(request.items, stores_with_loc)
+    if not quote.stores_needed:
+        raise HTTPException(status_code=400, detail="No basket items are sold at any located store")
+
+    sorted_stores = sorted(quote.store_totals.items(), key=lambda x: x[1])
     single_store_best_id, single_store_best_total = sorted_stores[0]
     single_store_best_name = stores_with_loc[single_store_best_id].name
 
-    # Calculate multi-store optimal (cheapest per item, using deals)
-    multi_store_items = []
-    stores_needed = set()
-    multi_store_total = 0
-
-    for item in request.items:
-        cat = categories_map.get(item.category_id)
-        if not cat:
-            continue
-        prices = cat.get("prices", {})
-        if not prices:
-            continue
-
-        # Only consider stores with locations for route optimization
-        # Find cheapest considering deals
-        cheapest_store_id = None
-        cheapest_price = float('inf')
-
-        for store_id in prices:
-            if store_id not in stores_with_loc:
-                continue
-            effective_price = get_effective_price(cat, store_id)
-            if effective_price < cheapest_price:
-                cheapest_price = effective_price
-                cheapest_store_id = store_id
-
-        if not cheapest_store_id:
-            continue
-
-        stores_needed.add(cheapest_store_id)
-
-        store = stores_with_loc[cheapest_store_id]
-        multi_store_items.append(MultiStoreItem(
-            category_id=item.category_id,
-            name=cat["name"],
-            store_id=cheapest_store_id,
-            store_name=store.name,
-            price=cheapest_price,
-            quantity=item.quantity,
-            color=store.color
-        ))
-        multi_store_total += cheapest_price * item.quantity
+    multi_store_items = _multi_store_items(snapshot, quote.assignments)
+    stores_needed = quote.stores_needed
+    multi_store_total = quote.multi_store_total
+
+    stay_single = False
+    if len(stores_needed) > 1:
+        # Buying every item at its cheapest store may not pay for the extra driving:
+        # take the subset whose grocery savings minus estimated travel cost is highest
+        optimizer = StoreSubsetOptimizer(quote)
+        # store_totals count items a store lacks as $0; only a store carrying the whole basket can be the fallback
+        single_mask = optimizer.best_mask(1)
+        if single_mask is not None:
+            single_store_best_id = optimizer.store_ids_for(single_mask)[0]
+            single_store_best_total = optimizer.costs[single_mask]
+            single_store_best_name = stores_with_loc[single_store_best_id].name
+        mask, route_order, best_net = await _best_route_subset(
+            optimizer, stores_with_loc, request.user_location, request.settings, single_store_best_total
+        )
+        multi_store_total = optimizer.costs[mask]
+        if best_net > 0 or single_mask is None:
+            multi_store_items = _multi_store_items(snapshot, optimizer.assignments(mask))
+            stores_needed = set(optimizer.store_ids_for(mask))
+        else:
+            # Staying at the cheapest complete single store (net savings 0) beats every multi-store trip
+            stay_single = True
+            multi_store_items = _multi_store_items(snapshot, optimizer.assignments(single_mask))
+            stores_needed = {single_store_best_id}
 
     multi_store_total = round(multi_store_total, 2)
     grocery_savings = round(single_store_best_total - multi_store_total, 2)
@@ -724,12 +1013,25 @@ async def optimize_route(request: RouteOptimizeRequest):
         store_id = list(stores_needed)[0]
         store = stores_with_loc[store_id]
         items_for_store = [i for i in multi_store_items if i.store_id == store_id]
+        if stay_single:
+            # Savings fields still describe the best multi-store trip, so the client can show what it would cost
+            grocery_total = round(single_store_best_total, 2)
+            net_savings = round(best_net, 2)
+            recommendation = (
+                f"Not worth it. Splitting your basket across stores would save ${grocery_savings:.2f} on groceries, "
+                f"but the extra driving and shopping time costs more. "
+                f"Just shop at {store.name} for ${grocery_total:.2f}."
+            )
+        else:
+            grocery_total = multi_store_total
+            net_savings = grocery_savings
+            recommendation = f"Shop at {store.name} - it has the best prices for all your items!"
 
         return RouteOptimizeResponse(
             stores_to_visit=[StoreVisit(
                 store=store,
                 items_to_buy=items_for_store,
-                store_subtotal=multi_store_total,
+                store_subtotal=grocery_total,
                 visit_duration_minutes=request.settings.time_per_store_minutes
             )],
             route_polyline=None,
@@ -742,23 +1044,16 @@ async def optimize_route(request: RouteOptimizeRequest):
                 time_cost=0,
                 total_travel_cost=0
             ),
-            grocery_total=multi_store_total,
+            grocery_total=grocery_total,
             single_store_best_total=round(single_store_best_total, 2),
             single_store_best_name=single_store_best_name,
             multi_store_total=multi_store_total,
             grocery_savings=grocery_savings,
-            net_savings=grocery_savings,
-            is_worth_it=True,
-            recommendation=f"Shop at {store.name} - it has the best prices for all your items!"
+            net_savings=net_savings,
+            is_worth_it=not stay_single,
+            recommendation=recommendation
         )
 
-    # Calculate optimal route order
-    route_order = _calculate_optimal_route_order(
-        request.user_location,
-        stores_with_loc,
-        stores_needed
-    )
-
     # Build coordinates for OpenRouteService (user -> stores -> user)
     coords = [[request.user_location.lng, request.user_location.lat]]  # ORS uses lng,lat
     for store_id in route_order:
@@ -766,51 +1061,27 @@ async def optimize_route(request: RouteOptimizeRequest):
         coords.append([store.lng, store.lat])
     coords.append([request.user_location.lng, request.user_location.lat])  # Return home
 
-    # Call OpenRouteService
+    # Road graph or OpenRouteService
     route_polyline = None
     try:
-        ors_response = await _call_openroute(coords)
-        route_data = ors_response["routes"][0]
-        summary = route_data["summary"]
-        total_distance_km = round(summary["distance"] / 1000, 2)
-        total_drive_time_minutes = round(summary["duration"] / 60, 1)
-        route_polyline = route_data.get("geometry")
+        route = await _route_summary(coords)
+        total_distance_km = round(route["distance"] / 1000, 2)
+        total_drive_time_minutes = round(route["duration"] / 60, 1)
+        route_polyline = route["polylines"][detail] if route["polylines"] else None
     except HTTPException:
-        # Fallback: estimate using straight-line distance
+        # Fallback: great-circle legs x road factor at an average city speed
         logger.warning("openroute.fallback using haversine estimation")
-        total_distance_km = 0
-        for i in range(len(coords) - 1):
-            lat1, lng1 = coords[i][1], coords[i][0]
-            lat2, lng2 = coords[i + 1][1], coords[i + 1][0]
-            # Simple approximation for Toronto area (~111km per degree)
-            dist = ((lat2 - lat1) ** 2 + (lng2 - lng1) ** 2) ** 0.5 * 111
-            total_distance_km += dist
-        total_distance_km = round(total_distance_km * 1.3, 2)  # Add 30% for road curves
-        total_drive_time_minutes = round(total_distance_km / 40 * 60, 1)  # Assume 40km/h avg
+        total_distance_km = sum(
+            haversine_km(a[1], a[0], b[1], b[0]) for a, b in zip(coords, coords[1:])
+        ) * ROAD_DISTANCE_FACTOR
+        total_distance_km = round(total_distance_km, 2)
+        total_drive_time_minutes = round(total_distance_km / AVERAGE_SPEED_KMH * 60, 1)
 
     # Calculate travel costs
     settings = request.settings
-    gas_cost = round(
-        (total_distance_km / 100) * settings.fuel_efficiency_l_per_100km * settings.gas_price_per_liter,
-        2
-    )
-    total_store_time = len(stores_needed) * settings.time_per_store_minutes
-    total_trip_time = total_drive_time_minutes + total_store_time
-    time_cost = round(
-        (total_trip_time / 60) * settings.time_value_per_hour,
-        2
-    )
-    total_travel_cost = round(gas_cost + time_cost, 2)
-
-    travel_cost = TravelCost(
-        total_distance_km=total_distance_km,
-        total_drive_time_minutes=total_drive_time_minutes,
-        total_store_time_minutes=total_store_time,
-        total_trip_time_minutes=round(total_trip_time, 1),
-        gas_cost=gas_cost,
-        time_cost=time_cost,
-        total_travel_cost=total_travel_cost
-    )
+    travel_cost = _travel_cost(total_distance_km, total_drive_time_minutes, len(stores_needed), settings)
+    total_travel_cost = travel_cost.total_travel_cost
+    total_trip_time = total_drive_time_minutes + travel_cost.total_store_time_minutes
 
     # Build store visits
     stores_to_visit = []
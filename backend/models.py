@@ -7,7 +7,7 @@ via any medium, is strictly prohibited without express written permission from S
 """
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Store(BaseModel):
@@ -41,6 +41,17 @@ class CategorySummary(BaseModel):
 
 class CategoriesResponse(BaseModel):
     categories: list[CategorySummary]
+    next_cursor: Optional[int] = None  # sort_order to pass as `after` for the next page
+
+
+class Suggestion(BaseModel):
+    category_id: str
+    name: str
+    cheapest_price: float
+
+
+class SuggestResponse(BaseModel):
+    suggestions: list[Suggestion]
 
 
 class PriceEntry(BaseModel):
@@ -72,6 +83,15 @@ class BasketItem(BaseModel):
 
 class BasketRequest(BaseModel):
     items: list[BasketItem]
+    max_stores: Optional[int] = None  # Also answer "cheapest using at most N stores"
+    allow_substitutes: bool = False  # Buy the cheapest equivalent product (same commodity and size)
+
+
+class BasketDelta(BaseModel):
+    """One edit to a basket session: add/remove/set a line, or clear the basket."""
+    op: Literal["add", "remove", "set", "clear"]
+    category_id: Optional[str] = None
+    quantity: int = 1
 
 
 class StoreTotal(BaseModel):
@@ -89,6 +109,23 @@ class MultiStoreItem(BaseModel):
     price: float
     quantity: int
     color: str
+    substituted_for: Optional[str] = None  # Requested category_id when an equivalent is bought instead
+
+
+class StoreCountPoint(BaseModel):
+    """Cheapest basket total achievable visiting `store_count` stores."""
+    store_count: int
+    store_ids: list[str]
+    total: float
+
+
+class LimitedStorePlan(BaseModel):
+    """Exact cheapest plan using at most `max_stores` stores."""
+    max_stores: int
+    store_ids: list[str]
+    items: list[MultiStoreItem]
+    total: float
+    savings_vs_worst: float
 
 
 class BasketAnalysis(BaseModel):
@@ -99,6 +136,17 @@ class BasketAnalysis(BaseModel):
     savings_vs_worst: float
     savings_percent: int
     annual_projection: float
+    # Only filled when the request sets max_stores
+    limited_store_plan: Optional[LimitedStorePlan] = None
+    store_count_frontier: Optional[list[StoreCountPoint]] = None
+
+
+class BatchBasketRequest(BaseModel):
+    baskets: list[BasketRequest]
+
+
+class BatchBasketResponse(BaseModel):
+    results: list[BasketAnalysis]
 
 
 class RecipeGenerateRequest(BaseModel):
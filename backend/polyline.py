@@ -0,0 +1,100 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import math
+import numpy as np
+
+# Google encoded polyline format, the geometry encoding OpenRouteService returns
+PRECISION = 5
+
+# Web-map ground resolution at the equator, zoom 0 (metres per 256-px tile pixel)
+_METRES_PER_PIXEL_Z0 = 156543.03
+_METRES_PER_DEGREE = 111320.0
+
+
+def encode(points: list[tuple[float, float]], precision: int = PRECISION) -> str:
+    """Encode (lat, lng) points as a polyline string."""
+    factor = 10 ** precision
+    result = []
+    prev_lat = prev_lng = 0
+    for lat, lng in points:
+        lat_i, lng_i = round(lat * factor), round(lng * factor)
+        for delta in (lat_i - prev_lat, lng_i - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lng = lat_i, lng_i
+    return "".join(result)
+
+
+def decode(encoded: str, precision: int = PRECISION) -> list[tuple[float, float]]:
+    """Decode a polyline string into (lat, lng) points."""
+    factor = 10 ** precision
+    points = []
+    index = lat = lng = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = value = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                value |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else value >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / factor, lng / factor))
+    return points
+
+
+def tolerance_for_zoom(zoom: int, lat: float) -> float:
+    """Metres covered by one map pixel at `zoom` and latitude `lat`."""
+    return _METRES_PER_PIXEL_Z0 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+def simplify(points: list[tuple[float, float]], tolerance_m: float) -> list[tuple[float, float]]:
+    """Douglas-Peucker: drop (lat, lng) points within `tolerance_m` of the simplified line.
+
+    Distances are measured on a local equirectangular projection, which is
+    exact enough at city scale. Endpoints are always kept.
+    """
+    if len(points) < 3 or tolerance_m <= 0:
+        return list(points)
+    coords = np.asarray(points, dtype=float)
+    scale = math.cos(math.radians(coords[0, 0]))
+    y = coords[:, 0] * _METRES_PER_DEGREE
+    x = coords[:, 1] * _METRES_PER_DEGREE * scale
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        # Distance of every interior point to the segment first -> last
+        ax, ay = x[first], y[first]
+        dx, dy = x[last] - ax, y[last] - ay
+        px, py = x[first + 1:last] - ax, y[first + 1:last] - ay
+        length_sq = dx * dx + dy * dy
+        if length_sq > 0:
+            t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+            px, py = px - t * dx, py - t * dy
+        distances = np.hypot(px, py)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_m:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return [points[i] for i in np.flatnonzero(keep)]
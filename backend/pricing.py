@@ -0,0 +1,388 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import copy
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+import numpy as np
+
+def deal_is_active(deal: Optional[dict], as_of: date) -> bool:
+    """A deal applies through the end of its `ends` date (ISO strings compare as dates)."""
+    if not deal or "sale_price" not in deal:
+        return False
+    ends = deal.get("ends")
+    return not ends or ends >= as_of.isoformat()
+
+
+def get_effective_price(cat: dict, store_id: str, as_of: Optional[date] = None) -> float:
+    """Get the effective price for a store, using deal price if a deal is active on `as_of` (default today)."""
+    prices = cat.get("prices", {})
+    deals = cat.get("deals", {})
+
+    base_price = prices.get(store_id, 0)
+    deal = deals.get(store_id)
+
+    if deal_is_active(deal, as_of or date.today()):
+        return deal["sale_price"]
+    return base_price
+
+
+def _savings_percent(cheapest: float, most_expensive: float) -> int:
+    return round((1 - cheapest / most_expensive) * 100) if most_expensive > 0 else 0
+
+
+def summary_fields(cat: dict) -> dict:
+    """Compute the list-view fields for a category document.
+
+    Regular prices only, so the fields never go stale as deals expire; deal
+    pricing comes from the snapshot's PriceMatrix. Returns {} when the
+    category has no prices.
+    """
+    prices = cat.get("prices", {})
+    if not prices:
+        return {}
+
+    sorted_prices = sorted(prices.items(), key=lambda x: x[1])
+    cheapest_store_id, cheapest_price = sorted_prices[0]
+    _, most_expensive_price = sorted_prices[-1]
+
+    return {
+        "cheapest_store": cheapest_store_id,
+        "cheapest_price": cheapest_price,
+        "most_expensive_price": most_expensive_price,
+        "savings_percent": _savings_percent(cheapest_price, most_expensive_price),
+    }
+
+
+class DealSchedule:
+    """Min-heap of the instants at which deals stop applying.
+
+    A deal ending on 2025-01-31 stops at local midnight starting 2025-02-01.
+    The heap is built once per catalog version; due entries are popped as
+    the price table is rebuilt.
+    """
+
+    def __init__(self, categories: list[dict]):
+        self._heap: list[float] = []
+        for cat in categories:
+            for deal in cat.get("deals", {}).values():
+                ends = deal.get("ends") if deal else None
+                if not ends:
+                    continue
+                try:
+                    expires = datetime.combine(date.fromisoformat(ends) + timedelta(days=1), time.min)
+                except ValueError:
+                    continue
+                self._heap.append(expires.timestamp())
+        heapq.heapify(self._heap)
+
+    def next_expiry(self, now: float) -> Optional[float]:
+        """Timestamp of the next expiry after `now`, dropping ones already past."""
+        while self._heap and self._heap[0] <= now:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+
+class PriceMatrix:
+    """Deal-adjusted effective prices as a dense (category x store) matrix.
+
+    Built for one calendar day (`as_of`): only deals still running that day
+    are applied, so request handlers never look at deal dates. Missing prices
+    are NaN. Single-store totals treat a product a store does not carry as 0,
+    matching how basket totals have always been reported; cheapest-store
+    lookups only ever pick stores that carry the product.
+
+    `substitutes` is a second view of the same table where every product is
+    priced at the cheapest member of its equivalence group at each store.
+    """
+
+    def __init__(self, categories: list[dict], stores: list[dict], as_of: Optional[date] = None):
+        self.as_of = as_of or date.today()
+        self.store_ids = [s["store_id"] for s in stores]
+        self.col_of = {store_id: j for j, store_id in enumerate(self.store_ids)}
+        self.category_ids = [c["category_id"] for c in categories]
+        self.row_of = {category_id: i for i, category_id in enumerate(self.category_ids)}
+
+        self.prices = np.full((len(categories), len(self.store_ids)), np.nan)
+        self.active_deal = np.zeros((len(categories), len(self.store_ids)), dtype=bool)
+        for i, cat in enumerate(categories):
+            prices = cat.get("prices", {})
+            deals = cat.get("deals", {})
+            for j, store_id in enumerate(self.store_ids):
+                if store_id in prices:
+                    self.prices[i, j] = get_effective_price(cat, store_id, self.as_of)
+                    self.active_deal[i, j] = deal_is_active(deals.get(store_id), self.as_of)
+
+        # Row actually bought for each (row, store); only differs from the row in the substitutes view
+        self.source_rows: Optional[np.ndarray] = None
+        self._derive()
+        self.substitutes = self._build_substitutes(categories)
+
+    def _derive(self) -> None:
+        n_rows = self.prices.shape[0]
+        self.carried = ~np.isnan(self.prices)
+        self.filled = np.where(self.carried, self.prices, 0.0)
+        masked = np.where(self.carried, self.prices, np.inf)
+        self.row_argmin = masked.argmin(axis=1) if len(self.store_ids) else np.zeros(n_rows, dtype=int)
+        self.row_min = masked.min(axis=1) if len(self.store_ids) else np.full(n_rows, np.inf)
+
+    def _build_substitutes(self, categories: list[dict]) -> "PriceMatrix":
+        """View pricing each product at its equivalence group's minimum, one vector min per group."""
+        groups: dict[str, list[int]] = {}
+        for i, cat in enumerate(categories):
+            groups.setdefault(cat.get("equivalence_group") or cat["category_id"], []).append(i)
+        shared = [np.array(rows) for rows in groups.values() if len(rows) > 1]
+        if not shared:
+            return self
+
+        prices = self.prices.copy()
+        source_rows = np.repeat(np.arange(len(categories))[:, None], len(self.store_ids), axis=1)
+        masked = np.where(self.carried, self.prices, np.inf)
+        for rows in shared:
+            block = masked[rows]
+            best = block.min(axis=0)
+            prices[rows] = np.where(np.isfinite(best), best, np.nan)
+            source_rows[rows] = rows[block.argmin(axis=0)]
+
+        view = copy.copy(self)
+        view.prices = prices
+        view.source_rows = source_rows
+        view._derive()
+        view.substitutes = view
+        return view
+
+    def bought(self, item, row: int, col: int):
+        """The basket item, or a Substitution when a cheaper equivalent is bought at that store."""
+        if self.source_rows is None or self.source_rows[row, col] == row:
+            return item
+        return Substitution(self.category_ids[self.source_rows[row, col]], item.quantity, item.category_id)
+
+    def store_mask(self, store_ids) -> np.ndarray:
+        wanted = set(store_ids)
+        return np.array([s in wanted for s in self.store_ids], dtype=bool)
+
+    def store_totals(self, rows: np.ndarray, quantities: np.ndarray) -> np.ndarray:
+        """Basket total per store: one vector-matrix product."""
+        return quantities @ self.filled[rows]
+
+    def cheapest(self, rows: np.ndarray, store_mask: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Cheapest store column and price per row; price is inf where no allowed store carries it."""
+        if store_mask is None:
+            return self.row_argmin[rows], self.row_min[rows]
+        masked = np.where(self.carried[rows] & store_mask, self.prices[rows], np.inf)
+        return masked.argmin(axis=1), masked.min(axis=1)
+
+    def basket_rows(self, items) -> tuple[list, np.ndarray, np.ndarray]:
+        """Basket items found in the catalog, with their matrix rows and quantities."""
+        known = [item for item in items if item.category_id in self.row_of]
+        rows = np.array([self.row_of[item.category_id] for item in known], dtype=int)
+        quantities = np.array([item.quantity for item in known], dtype=float)
+        return known, rows, quantities
+
+    def quote(self, basket_items, store_ids=None) -> "BasketQuote":
+        """Price a basket, optionally restricted to the given stores."""
+        items, rows, quantities = self.basket_rows(basket_items)
+        store_mask = self.store_mask(store_ids) if store_ids is not None else None
+        totals = self.store_totals(rows, quantities)
+        cheapest_cols, cheapest_prices = self.cheapest(rows, store_mask)
+        return BasketQuote(self, items, rows, quantities, totals, cheapest_cols, cheapest_prices, store_mask)
+
+    def quote_many(self, baskets: list[list]) -> list["BasketQuote"]:
+        """Price many baskets against one shared slice of the matrix."""
+        # Union of category_ids across all baskets, each priced once
+        union: dict[str, int] = {}
+        for basket_items in baskets:
+            for item in basket_items:
+                if item.category_id in self.row_of:
+                    union.setdefault(item.category_id, len(union))
+        union_rows = np.array([self.row_of[cid] for cid in union], dtype=int)
+
+        quantities = np.zeros((len(baskets), len(union)))
+        for n, basket_items in enumerate(baskets):
+            for item in basket_items:
+                if item.category_id in union:
+                    quantities[n, union[item.category_id]] += item.quantity
+
+        # (baskets x union) @ (union x stores) -> every basket's per-store totals at once
+        totals = quantities @ self.filled[union_rows]
+        union_cols, union_prices = self.cheapest(union_rows)
+
+        quotes = []
+        for n, basket_items in enumerate(baskets):
+            items = [item for item in basket_items if item.category_id in union]
+            idx = np.array([union[item.category_id] for item in items], dtype=int)
+            item_quantities = np.array([item.quantity for item in items], dtype=float)
+            quotes.append(BasketQuote(
+                self, items, union_rows[idx], item_quantities, totals[n], union_cols[idx], union_prices[idx]
+            ))
+        return quotes
+
+
+class Substitution(NamedTuple):
+    """An equivalent product bought in place of a basket item."""
+    category_id: str
+    quantity: int
+    substituted_for: str
+
+
+class BasketQuote:
+    """Single-store totals and cheapest-store assignment for one basket.
+
+    This is the one pricing result both basket analysis and route
+    optimization consume, so their savings numbers always agree. Values are
+    unrounded; callers round for display.
+    """
+
+    def __init__(self, matrix: PriceMatrix, items: list, rows: np.ndarray, quantities: np.ndarray,
+                 totals: np.ndarray, cheapest_cols: np.ndarray, cheapest_prices: np.ndarray,
+                 store_mask: Optional[np.ndarray] = None):
+        self.matrix = matrix
+        self.items = items
+        self.rows = rows
+        self.quantities = quantities
+        self.store_mask = store_mask if store_mask is not None else np.ones(len(matrix.store_ids), dtype=bool)
+        self.store_totals = {
+            store_id: float(totals[j])
+            for j, store_id in enumerate(matrix.store_ids)
+            if store_mask is None or store_mask[j]
+        }
+        # (item, store_id, price) for every item some allowed store carries
+        self.assignments = [
+            (matrix.bought(item, row, col), matrix.store_ids[col], float(price))
+            for item, row, col, price in zip(items, rows, cheapest_cols, cheapest_prices)
+            if np.isfinite(price)
+        ]
+        self.multi_store_total = sum(price * item.quantity for item, _, price in self.assignments)
+        self.stores_needed = {store_id for _, store_id, _ in self.assignments}
+
+
+class StoreSubsetOptimizer:
+    """Exact cheapest basket cost for every subset of stores, by bitmask DP.
+
+    With S stores there are 2^S subsets (64 for six chains). The per-item
+    minimum over a subset extends the subset without its lowest store:
+    best[mask] = min(best[mask - low], price[low]), so each subset costs one
+    vector minimum and one dot product. Subsets outside the quote's store
+    filter or larger than `max_size` are never expanded. Items no allowed
+    store carries are left out, as in the multi-store plan.
+    """
+
+    def __init__(self, quote: BasketQuote, max_size: Optional[int] = None):
+        matrix = quote.matrix
+        self.store_ids = matrix.store_ids
+        n_stores = len(self.store_ids)
+        max_size = n_stores if max_size is None else min(max_size, n_stores)
+
+        prices = np.where(matrix.carried[quote.rows] & quote.store_mask, matrix.prices[quote.rows], np.inf)
+        buyable = np.isfinite(prices.min(axis=1)) if n_stores else np.zeros(len(quote.items), dtype=bool)
+        self.matrix = matrix
+        self.items = [item for item, ok in zip(quote.items, buyable) if ok]
+        self._rows = quote.rows[buyable]
+        self._prices = prices[buyable]
+        quantities = quote.quantities[buyable]
+
+        allowed_bits = sum(1 << j for j in range(n_stores) if quote.store_mask[j])
+        self._best = {0: np.full(len(self.items), np.inf)}
+        self.costs = {0: 0.0 if not self.items else np.inf}
+        # Increasing mask order guarantees mask - low was computed before mask
+        for mask in range(1, 1 << n_stores):
+            if mask & ~allowed_bits or bin(mask).count("1") > max_size:
+                continue
+            low = mask & -mask
+            best = np.minimum(self._best[mask ^ low], self._prices[:, low.bit_length() - 1])
+            self._best[mask] = best
+            self.costs[mask] = float(quantities @ best) if np.isfinite(best).all() else np.inf
+
+    def store_ids_for(self, mask: int) -> list[str]:
+        return [store_id for j, store_id in enumerate(self.store_ids) if mask >> j & 1]
+
+    def _by_size(self) -> dict[int, int]:
+        """Cheapest feasible mask for each store count (fewest stores wins ties)."""
+        best: dict[int, int] = {}
+        for mask, cost in self.costs.items():
+            if not np.isfinite(cost):
+                continue
+            size = bin(mask).count("1")
+            if size not in best or cost < self.costs[best[size]] - 1e-9:
+                best[size] = mask
+        return best
+
+    def best_mask(self, max_stores: int) -> Optional[int]:
+        """Cheapest subset using at most `max_stores` stores, or None if none covers the basket."""
+        chosen = None
+        for size, mask in sorted(self._by_size().items()):
+            if size > max_stores:
+                break
+            if chosen is None or self.costs[mask] < self.costs[chosen] - 1e-9:
+                chosen = mask
+        return chosen
+
+    def frontier(self) -> list[tuple[int, float, list[str]]]:
+        """Pareto frontier of (stores visited, total cost, stores): each extra store must save money."""
+        points = []
+        for size, mask in sorted(self._by_size().items()):
+            if not points or self.costs[mask] < points[-1][1] - 1e-9:
+                points.append((size, self.costs[mask], self.store_ids_for(mask)))
+        return points
+
+    def assignments(self, mask: int) -> list[tuple]:
+        """(item, store_id, price) for each item at its cheapest store within the subset."""
+        cols = [j for j in range(len(self.store_ids)) if mask >> j & 1]
+        if not cols:
+            return []
+        sub = self._prices[:, cols]
+        picks = sub.argmin(axis=1)
+        return [
+            (self.matrix.bought(item, row, cols[k]), self.store_ids[cols[k]], float(sub[i, k]))
+            for i, (item, row, k) in enumerate(zip(self.items, self._rows, picks))
+        ]
+
+
+class BasketLine(NamedTuple):
+    category_id: str
+    quantity: int
+
+
+class BasketSession:
+    """A basket kept priced across edits.
+
+    Running per-store totals move by quantity delta x one matrix row, so an
+    add, remove or quantity change costs O(stores); each line's cheapest store
+    comes from the matrix's precomputed row argmin. A new price table (reload
+    or deal expiry) rebuilds the totals once from the current lines.
+    """
+
+    def __init__(self, matrix: PriceMatrix):
+        self.lines: dict[str, int] = {}
+        self.rebuild(matrix)
+
+    def rebuild(self, matrix: PriceMatrix) -> None:
+        self.matrix = matrix
+        self.lines = {cid: q for cid, q in self.lines.items() if cid in matrix.row_of}
+        self.totals = np.zeros(len(matrix.store_ids))
+        for category_id, quantity in self.lines.items():
+            self.totals += quantity * matrix.filled[matrix.row_of[category_id]]
+
+    def set(self, category_id: str, quantity: int) -> None:
+        """Set a line's quantity; 0 removes it."""
+        delta = quantity - self.lines.get(category_id, 0)
+        if quantity:
+            self.lines[category_id] = quantity
+        else:
+            self.lines.pop(category_id, None)
+        self.totals += delta * self.matrix.filled[self.matrix.row_of[category_id]]
+
+    def quote(self) -> BasketQuote:
+        items = [BasketLine(cid, q) for cid, q in self.lines.items()]
+        rows = np.array([self.matrix.row_of[item.category_id] for item in items], dtype=int)
+        quantities = np.array([item.quantity for item in items], dtype=float)
+        return BasketQuote(
+            self.matrix, items, rows, quantities, self.totals,
+            self.matrix.row_argmin[rows], self.matrix.row_min[rows]
+        )
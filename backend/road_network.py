@@ -0,0 +1,374 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import os
+import math
+import heapq
+import logging
+from typing import Optional
+import numpy as np
+from routing import (
+    AVERAGE_SPEED_KMH, ROAD_DISTANCE_FACTOR, KDTree, distance_matrix, haversine_km, unit_vectors
+)
+
+logger = logging.getLogger("savour.road_network")
+
+ROAD_GRAPH_PATH = os.getenv("ROAD_GRAPH_PATH", "")
+
+# Witness searches give up after settling this many nodes (a missed witness only adds a shortcut)
+WITNESS_SETTLE_LIMIT = 500
+
+# The stretch between a query point and its nearest road node is driven at this speed
+SNAP_SPEED_KMH = 20.0
+
+# Points farther than this from every road node are outside the graph's region
+MAX_SNAP_KM = 1.5
+
+_FORMAT_VERSION = 1
+
+
+class NoRoute(Exception):
+    """No road path connects the requested points."""
+
+
+def build_contraction_hierarchy(node_count: int, edges: list[tuple[int, int, float, float]]):
+    """Contract a directed road graph; returns (rank, up edges, down edges).
+
+    `edges` are (from, to, seconds, metres). Nodes are contracted in order of
+    edge difference plus contracted neighbours, with lazy priority updates.
+    Each contraction adds a shortcut u -> x through v unless a witness search
+    finds a path at least as fast that avoids v. Returned edges are
+    (from, to, seconds, metres, middle node or -1); up edges go to a
+    higher-ranked node, down edges come from one.
+    """
+    out: list[dict[int, tuple[float, float, int]]] = [{} for _ in range(node_count)]
+    inc: list[dict[int, tuple[float, float, int]]] = [{} for _ in range(node_count)]
+
+    def add_edge(u: int, v: int, seconds: float, metres: float, mid: int) -> None:
+        current = out[u].get(v)
+        if current is None or seconds < current[0]:
+            out[u][v] = inc[v][u] = (seconds, metres, mid)
+
+    for u, v, seconds, metres in edges:
+        if u != v:
+            add_edge(u, v, seconds, metres, -1)
+
+    contracted = [False] * node_count
+    deleted_neighbours = [0] * node_count
+
+    def witness_distances(source: int, skip: int, limit: float, targets: set[int]) -> dict[int, float]:
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        remaining = set(targets)
+        settled = 0
+        while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            remaining.discard(u)
+            settled += 1
+            for x, (seconds, _, _) in out[u].items():
+                if x == skip or contracted[x]:
+                    continue
+                nd = d + seconds
+                if nd < dist.get(x, math.inf):
+                    dist[x] = nd
+                    heapq.heappush(heap, (nd, x))
+        return dist
+
+    def shortcuts_for(v: int) -> list[tuple[int, int, float, float]]:
+        outs = [(x, e) for x, e in out[v].items() if not contracted[x]]
+        needed = []
+        for u, (in_seconds, in_metres, _) in inc[v].items():
+            if contracted[u]:
+                continue
+            targets = {x for x, _ in outs if x != u}
+            if not targets:
+                continue
+            limit = in_seconds + max(e[0] for x, e in outs if x != u)
+            dist = witness_distances(u, v, limit, targets)
+            for x, (out_seconds, out_metres, _) in outs:
+                if x != u and dist.get(x, math.inf) > in_seconds + out_seconds:
+                    needed.append((u, x, in_seconds + out_seconds, in_metres + out_metres))
+        return needed
+
+    def priority(v: int, shortcuts: list) -> int:
+        degree = sum(not contracted[x] for x in out[v]) + sum(not contracted[u] for u in inc[v])
+        return len(shortcuts) - degree + deleted_neighbours[v]
+
+    heap = [(priority(v, shortcuts_for(v)), v) for v in range(node_count)]
+    heapq.heapify(heap)
+    rank = [0] * node_count
+    order = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        if contracted[v]:
+            continue
+        shortcuts = shortcuts_for(v)
+        prio = priority(v, shortcuts)
+        if heap and prio > heap[0][0]:
+            heapq.heappush(heap, (prio, v))
+            continue
+        for u, x, seconds, metres in shortcuts:
+            add_edge(u, x, seconds, metres, v)
+        contracted[v] = True
+        rank[v] = order
+        order += 1
+        for x in set(out[v]) | set(inc[v]):
+            deleted_neighbours[x] += 1
+
+    up, down = [], []
+    for u in range(node_count):
+        for x, (seconds, metres, mid) in out[u].items():
+            (up if rank[x] > rank[u] else down).append((u, x, seconds, metres, mid))
+    return rank, up, down
+
+
+def _csr(node_count: int, keys: np.ndarray, columns: list[np.ndarray]):
+    """Group edge columns by `keys` into offsets plus sorted columns."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.add.at(offsets, keys + 1, 1)
+    return np.cumsum(offsets), [column[order] for column in columns]
+
+
+class RoadNetwork:
+    """Contraction-hierarchy road graph answering drive time and distance queries in-process.
+
+    Queries run a bidirectional Dijkstra restricted to upward edges, so each
+    side only settles the small set of nodes ranked above its endpoint.
+    Many-to-many matrices use bucket searches: one backward search per
+    target, one forward search per source.
+    """
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, rank: np.ndarray,
+                 up: tuple[np.ndarray, ...], down: tuple[np.ndarray, ...]):
+        self.lat = lat
+        self.lng = lng
+        self.rank = rank.tolist()
+        n = len(lat)
+        # Upward edges grouped by source; downward edges grouped by target (searched in reverse)
+        up_offsets, up_cols = _csr(n, up[0], [up[1], up[2], up[3], up[4]])
+        down_offsets, down_cols = _csr(n, down[1], [down[0], down[2], down[3], down[4]])
+        self._up = self._adjacency(up_offsets, up_cols)
+        self._down = self._adjacency(down_offsets, down_cols)
+        self._raw = (up, down)
+        self._tree = KDTree(unit_vectors(lat, lng))
+
+    @staticmethod
+    def _adjacency(offsets: np.ndarray, columns: list[np.ndarray]) -> list[list[tuple[int, float, float, int]]]:
+        # Python lists of (neighbour, seconds, metres, mid): per-element numpy access is too slow for Dijkstra
+        neighbours, seconds, metres, mids = (c.tolist() for c in columns)
+        edges = list(zip(neighbours, seconds, metres, mids))
+        bounds = offsets.tolist()
+        return [edges[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    @property
+    def node_count(self) -> int:
+        return len(self.rank)
+
+    @classmethod
+    def from_edges(cls, lat: np.ndarray, lng: np.ndarray, edges: list[tuple[int, int, float, float]]) -> "RoadNetwork":
+        rank, up, down = build_contraction_hierarchy(len(lat), edges)
+
+        def columns(rows):
+            return (
+                np.array([r[0] for r in rows], dtype=np.int64),
+                np.array([r[1] for r in rows], dtype=np.int64),
+                np.array([r[2] for r in rows], dtype=np.float64),
+                np.array([r[3] for r in rows], dtype=np.float64),
+                np.array([r[4] for r in rows], dtype=np.int64),
+            )
+
+        return cls(np.asarray(lat, dtype=float), np.asarray(lng, dtype=float),
+                   np.array(rank, dtype=np.int64), columns(up), columns(down))
+
+    def save(self, path: str) -> None:
+        up, down = self._raw
+        np.savez_compressed(
+            path, version=_FORMAT_VERSION, lat=self.lat, lng=self.lng, rank=np.array(self.rank, dtype=np.int64),
+            up_from=up[0], up_to=up[1], up_seconds=up[2], up_metres=up[3], up_mid=up[4],
+            down_from=down[0], down_to=down[1], down_seconds=down[2], down_metres=down[3], down_mid=down[4],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadNetwork":
+        with np.load(path) as data:
+            if int(data["version"]) != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported road graph format {int(data['version'])} in {path}")
+            up = tuple(data[f"up_{k}"] for k in ("from", "to", "seconds", "metres", "mid"))
+            down = tuple(data[f"down_{k}"] for k in ("from", "to", "seconds", "metres", "mid"))
+            network = cls(data["lat"], data["lng"], data["rank"], up, down)
+        logger.info("road_network.loaded path=%s nodes=%s edges=%s", path, network.node_count, len(up[0]) + len(down[0]))
+        return network
+
+    def _nearest(self, lat: float, lng: float) -> tuple[int, float]:
+        node = self._tree.nearest(unit_vectors(lat, lng))
+        return node, haversine_km(lat, lng, float(self.lat[node]), float(self.lng[node]))
+
+    def snap(self, lat: float, lng: float) -> tuple[int, float]:
+        """Nearest road node and the straight-line km to it; NoRoute beyond MAX_SNAP_KM."""
+        node, km = self._nearest(lat, lng)
+        if km > MAX_SNAP_KM:
+            raise NoRoute(f"({lat}, {lng}) is {km:.1f} km from the nearest road node")
+        return node, km
+
+    def _search(self, source: int, adjacency: list) -> dict[int, tuple[float, float, int]]:
+        """Full upward Dijkstra: node -> (seconds, metres, previous node)."""
+        labels = {source: (0.0, 0.0, -1)}
+        heap = [(0.0, source)]
+        done = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            metres = labels[u][1]
+            for x, seconds, edge_metres, _ in adjacency[u]:
+                nd = d + seconds
+                if x not in labels or nd < labels[x][0]:
+                    labels[x] = (nd, metres + edge_metres, u)
+                    heapq.heappush(heap, (nd, x))
+        return {u: labels[u] for u in done}
+
+    def _edge(self, a: int, b: int) -> tuple[float, float, int]:
+        """The graph edge a -> b as (seconds, metres, mid)."""
+        if self.rank[a] < self.rank[b]:
+            candidates = ((x, s, m, mid) for x, s, m, mid in self._up[a] if x == b)
+        else:
+            candidates = ((x, s, m, mid) for x, s, m, mid in self._down[b] if x == a)
+        _, seconds, metres, mid = min(candidates, key=lambda e: e[1])
+        return seconds, metres, mid
+
+    def _unpack(self, path: list[int]) -> list[int]:
+        """Expand shortcut edges along a CH path into original road nodes."""
+        nodes = [path[0]]
+        for a, b in zip(path, path[1:]):
+            stack = [(a, b)]
+            while stack:
+                u, v = stack.pop()
+                mid = self._edge(u, v)[2]
+                if mid == -1:
+                    nodes.append(v)
+                else:
+                    stack.append((mid, v))
+                    stack.append((u, mid))
+        return nodes
+
+    def shortest_path(self, source: int, target: int) -> tuple[float, float, list[int]]:
+        """(seconds, metres, road nodes) of the fastest path between two nodes."""
+        if source == target:
+            return 0.0, 0.0, [source]
+        labels = ({source: (0.0, 0.0, -1)}, {target: (0.0, 0.0, -1)})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        done = (set(), set())
+        adjacency = (self._up, self._down)
+        best, meet = math.inf, -1
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if d >= best:
+                # Neither side can improve on the best meeting point any more
+                if not heaps[1 - side] or heaps[1 - side][0][0] >= best:
+                    break
+                heaps[side].clear()
+                continue
+            if u in done[side]:
+                continue
+            done[side].add(u)
+            other = labels[1 - side].get(u)
+            if other is not None and d + other[0] < best:
+                best, meet = d + other[0], u
+            metres = labels[side][u][1]
+            for x, seconds, edge_metres, _ in adjacency[side][u]:
+                nd = d + seconds
+                if x not in labels[side] or nd < labels[side][x][0]:
+                    labels[side][x] = (nd, metres + edge_metres, u)
+                    heapq.heappush(heaps[side], (nd, x))
+        if meet == -1:
+            raise NoRoute(f"No road path from node {source} to node {target}")
+
+        forward, node = [], meet
+        while node != -1:
+            forward.append(node)
+            node = labels[0][node][2]
+        backward, node = [], labels[1][meet][2]
+        while node != -1:
+            backward.append(node)
+            node = labels[1][node][2]
+        path = forward[::-1] + backward
+        metres = labels[0][meet][1] + labels[1][meet][1]
+        return best, metres, self._unpack(path)
+
+    def route(self, points: list[tuple[float, float]]) -> dict:
+        """Drive through (lat, lng) points in order: {"distance": m, "duration": s, "geometry": [(lat, lng)]}."""
+        snapped = [self.snap(lat, lng) for lat, lng in points]
+        seconds = metres = 0.0
+        geometry: list[tuple[float, float]] = [points[0]]
+        for (a, a_km), (b, b_km), end in zip(snapped, snapped[1:], points[1:]):
+            leg_seconds, leg_metres, nodes = self.shortest_path(a, b)
+            snap_km = a_km + b_km
+            seconds += leg_seconds + snap_km / SNAP_SPEED_KMH * 3600
+            metres += leg_metres + snap_km * 1000
+            geometry.extend((float(self.lat[n]), float(self.lng[n])) for n in nodes)
+            geometry.append(end)
+        return {"distance": metres, "duration": seconds, "geometry": geometry}
+
+    def matrix(self, points: list[tuple[float, float]]) -> tuple[np.ndarray, np.ndarray]:
+        """Driving km and minutes between every ordered pair of (lat, lng) points.
+
+        Pairs that are unreachable, or involve a point too far from any road
+        (see MAX_SNAP_KM), are inf.
+        """
+        snapped = [self._nearest(lat, lng) for lat, lng in points]
+        on_graph = [km <= MAX_SNAP_KM for _, km in snapped]
+        n = len(points)
+        buckets: dict[int, list[tuple[int, float, float]]] = {}
+        for j, (node, _) in enumerate(snapped):
+            if not on_graph[j]:
+                continue
+            for u, (seconds, metres, _) in self._search(node, self._down).items():
+                buckets.setdefault(u, []).append((j, seconds, metres))
+
+        seconds_matrix = np.full((n, n), np.inf)
+        metres_matrix = np.full((n, n), np.inf)
+        for i, (node, _) in enumerate(snapped):
+            if not on_graph[i]:
+                continue
+            for u, (up_seconds, up_metres, _) in self._search(node, self._up).items():
+                for j, down_seconds, down_metres in buckets.get(u, ()):
+                    if up_seconds + down_seconds < seconds_matrix[i, j]:
+                        seconds_matrix[i, j] = up_seconds + down_seconds
+                        metres_matrix[i, j] = up_metres + down_metres
+
+        snap_km = np.array([km for _, km in snapped])
+        legs_km = snap_km[:, None] + snap_km[None, :]
+        km = metres_matrix / 1000 + legs_km
+        minutes = seconds_matrix / 60 + legs_km / SNAP_SPEED_KMH * 60
+        np.fill_diagonal(km, 0.0)
+        np.fill_diagonal(minutes, 0.0)
+        return km, minutes
+
+
+def load_road_network(path: str = ROAD_GRAPH_PATH) -> Optional[RoadNetwork]:
+    """The road graph at `path`, or None when unset or unreadable (callers fall back to ORS)."""
+    if not path:
+        return None
+    try:
+        return RoadNetwork.load(path)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.exception("road_network.load_failed path=%s error=%s", path, exc)
+        return None
+
+
+def estimate_legs(points: list[tuple[float, float]]) -> tuple[np.ndarray, np.ndarray]:
+    """Straight-line fallback for RoadNetwork.matrix: haversine km x road factor at an average speed."""
+    km = distance_matrix(points) * ROAD_DISTANCE_FACTOR
+    return km, km / AVERAGE_SPEED_KMH * 60
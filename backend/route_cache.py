@@ -0,0 +1,176 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Optional
+from caching import LRUTTLCache
+
+logger = logging.getLogger("savour.route_cache")
+
+ROUTE_CACHE_PATH = os.getenv(
+    "ROUTE_CACHE_PATH", os.path.join(os.path.dirname(__file__), "route_cache.sqlite3")
+)
+ROUTE_CACHE_TTL_SECONDS = float(os.getenv("ROUTE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+ROUTE_CACHE_MAX_ROWS = int(os.getenv("ROUTE_CACHE_MAX_ROWS", "20000"))
+ROUTE_CACHE_MEMORY_SIZE = int(os.getenv("ROUTE_CACHE_MEMORY_SIZE", "1024"))
+
+# 0.001 degrees is ~110 m of latitude (~80 m of longitude around Montreal)
+GRID_DECIMALS = 3
+
+
+def route_key(coordinates: list[list[float]]) -> str:
+    """Ordered [lng, lat] waypoints snapped to the ~100 m grid."""
+    return ";".join(f"{lng:.{GRID_DECIMALS}f},{lat:.{GRID_DECIMALS}f}" for lng, lat in coordinates)
+
+
+class _DiskTier:
+    """SQLite table of routes; every call blocks, so callers run it off the event loop."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_rows: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS routes ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS routes_used_at ON routes (used_at)")
+        self._conn.commit()
+        # Kept current by every write so stats() never has to query from the event loop
+        self.rows = self._conn.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM routes WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl_seconds < now:
+                self.rows -= self._conn.execute("DELETE FROM routes WHERE key = ?", (key,)).rowcount
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE routes SET used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM routes WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO routes (key, value, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), now, now),
+            )
+            if not exists:
+                self.rows += 1
+            if self.rows > self.max_rows:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float) -> None:
+        """Expired rows first, then the least recently used down to 90% of the cap so pruning stays rare."""
+        self.rows -= self._conn.execute(
+            "DELETE FROM routes WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.rows -= self._conn.execute(
+            "DELETE FROM routes WHERE key IN ("
+            " SELECT key FROM routes ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (int(self.max_rows * 0.9),),
+        ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RouteCache:
+    """Two-tier cache of routing results: in-memory LRU in front of a SQLite file.
+
+    Values are {"distance": metres, "duration": seconds, "polylines": {detail: encoded} or None}.
+    Keys are the snapped waypoint list, so nearby users asking for the same
+    store locations share an entry. An empty `path` keeps the memory tier only.
+    """
+
+    def __init__(self, path: Optional[str] = ROUTE_CACHE_PATH, ttl_seconds: float = ROUTE_CACHE_TTL_SECONDS,
+                 max_rows: int = ROUTE_CACHE_MAX_ROWS, memory_size: int = ROUTE_CACHE_MEMORY_SIZE):
+        self.path = path
+        self._memory = LRUTTLCache(maxsize=memory_size, ttl_seconds=ttl_seconds)
+        self._ttl_seconds = ttl_seconds
+        self._max_rows = max_rows
+        self._disk: Optional[_DiskTier] = None
+        self._disk_failed = False
+        self._disk_opening = asyncio.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def _disk_tier(self) -> Optional[_DiskTier]:
+        if self._disk is not None or not self.path or self._disk_failed:
+            return self._disk
+        async with self._disk_opening:
+            if self._disk is None and not self._disk_failed:
+                try:
+                    # Connecting, creating the table and counting rows all block
+                    self._disk = await asyncio.to_thread(_DiskTier, self.path, self._ttl_seconds, self._max_rows)
+                except sqlite3.Error as exc:
+                    # Keep serving from memory rather than failing route requests
+                    self._disk_failed = True
+                    logger.exception("route_cache.disk_unavailable path=%s error=%s", self.path, exc)
+        return self._disk
+
+    async def get(self, coordinates: list[list[float]]) -> Optional[dict]:
+        key = route_key(coordinates)
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+        disk = await self._disk_tier()
+        if disk is not None:
+            try:
+                value = await asyncio.to_thread(disk.get, key)
+            except sqlite3.Error as exc:
+                logger.warning("route_cache.disk_read_failed error=%s", exc)
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self._memory.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, coordinates: list[list[float]], value: dict) -> None:
+        key = route_key(coordinates)
+        self._memory.set(key, value)
+        disk = await self._disk_tier()
+        if disk is not None:
+            try:
+                await asyncio.to_thread(disk.set, key, value)
+            except sqlite3.Error as exc:
+                logger.warning("route_cache.disk_write_failed error=%s", exc)
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.misses
+        return {
+            "memory": memory,
+            "disk_path": self.path or None,
+            "disk_rows": self._disk.rows if self._disk is not None else None,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((memory["hits"] + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,206 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Held-Karp is O(n^2 2^n); past this many stops fall back to nearest neighbour
+MAX_EXACT_STOPS = 12
+
+# Straight-line to road estimate used when no routing service answers
+ROAD_DISTANCE_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 40.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def distance_matrix(points: list[tuple[float, float]]) -> np.ndarray:
+    """Pairwise haversine distances (km) between (lat, lng) points."""
+    coords = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lat, lng = coords[:, 0:1], coords[:, 1:2]
+    a = np.sin((lat.T - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin((lng.T - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def tour_length(dist: np.ndarray, order: list[int]) -> float:
+    """Length of the closed tour 0 -> order... -> 0."""
+    path = [0, *order, 0]
+    return float(sum(dist[a, b] for a, b in zip(path, path[1:])))
+
+
+def nearest_neighbour_order(dist: np.ndarray) -> list[int]:
+    """Greedy tour from node 0: always go to the closest unvisited node."""
+    remaining = set(range(1, len(dist)))
+    order = []
+    current = 0
+    while remaining:
+        current = min(remaining, key=lambda j: (dist[current, j], j))
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+class TourTable:
+    """Held-Karp tables giving the shortest closed tour from node 0 for every subset of stops.
+
+    cost[mask][j] is the shortest path leaving 0, visiting exactly the nodes
+    in `mask` and ending at j; each state extends the cheapest state for the
+    mask without j. Bit j of a mask is node j + 1. One build answers every
+    subset, which is what lets route planning compare store subsets cheaply.
+    """
+
+    def __init__(self, dist: np.ndarray):
+        # Python floats and lists: per-element numpy indexing would dominate the runtime
+        dist = np.asarray(dist, dtype=float).tolist()
+        n = len(dist) - 1
+        self.n = n
+        self._home = [dist[j + 1][0] for j in range(n)]
+        to_node = [[dist[k + 1][j + 1] for k in range(n)] for j in range(n)]  # to_node[j][k] = dist(k -> j)
+        full = (1 << n) - 1
+        members = [[j for j in range(n) if mask >> j & 1] for mask in range(full + 1)]
+        self._members = members
+        cost = [[math.inf] * n for _ in range(full + 1)]
+        parent = [[-1] * n for _ in range(full + 1)]
+        for j in range(n):
+            cost[1 << j][j] = dist[0][j + 1]
+
+        for mask in range(1, full + 1):
+            for j in members[mask]:
+                prev = mask ^ (1 << j)
+                if not prev:
+                    continue
+                prev_cost, into_j = cost[prev], to_node[j]
+                best, best_k = math.inf, -1
+                for k in members[prev]:
+                    value = prev_cost[k] + into_j[k]
+                    if value < best:
+                        best, best_k = value, k
+                cost[mask][j], parent[mask][j] = best, best_k
+        self._cost = cost
+        self._parent = parent
+
+    def _last(self, mask: int) -> int:
+        return min(self._members[mask], key=lambda j: (self._cost[mask][j] + self._home[j], j))
+
+    def length(self, mask: int) -> float:
+        """Shortest round trip from node 0 through the nodes in `mask`."""
+        if not mask:
+            return 0.0
+        last = self._last(mask)
+        return self._cost[mask][last] + self._home[last]
+
+    def order(self, mask: int) -> list[int]:
+        """Node indices of that round trip, in visiting order."""
+        if not mask:
+            return []
+        last = self._last(mask)
+        order = []
+        while last != -1:
+            order.append(last + 1)
+            mask, last = mask ^ (1 << last), self._parent[mask][last]
+        return order[::-1]
+
+
+def held_karp_order(dist: np.ndarray) -> list[int]:
+    """Exact shortest closed tour from node 0 through every other node."""
+    n = len(dist) - 1
+    if n <= 1:
+        return list(range(1, n + 1))
+    if n > MAX_EXACT_STOPS:
+        return nearest_neighbour_order(dist)
+    return TourTable(dist).order((1 << n) - 1)
+
+
+def unit_vectors(lat, lng) -> np.ndarray:
+    """Points on the unit sphere; chord length grows monotonically with great-circle distance."""
+    phi, lmb = np.radians(lat), np.radians(lng)
+    return np.stack([np.cos(phi) * np.cos(lmb), np.cos(phi) * np.sin(lmb), np.sin(phi)], axis=-1)
+
+
+class KDTree:
+    """Static 3-d tree over unit-sphere points, answering nearest-point queries in O(log n)."""
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        self._coords = points.tolist()  # Plain floats for the query loop
+        # Flat node arrays: point index, split axis, left and right child (-1 for none)
+        self._index: list[int] = []
+        self._axis: list[int] = []
+        self._left: list[int] = []
+        self._right: list[int] = []
+        self._root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indices: list[int], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self._coords[i][axis])
+        mid = len(indices) // 2
+        node = len(self._index)
+        self._index.append(indices[mid])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(indices[:mid], depth + 1)
+        self._right[node] = self._build(indices[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, query: np.ndarray) -> int:
+        """Index of the point closest to `query` (ties go to the lower index)."""
+        x, y, z = q = query.tolist()
+        coords = self._coords
+        best = [math.inf, -1]
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node == -1:
+                continue
+            i = self._index[node]
+            px, py, pz = coords[i]
+            d = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+            if d < best[0] or (d == best[0] and i < best[1]):
+                best = [d, i]
+            diff = q[self._axis[node]] - coords[i][self._axis[node]]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            # Only cross the split plane when the ball around the query reaches it
+            if diff * diff <= best[0]:
+                stack.append(far)
+            stack.append(near)
+        return best[1]
+
+
+class LocationIndex:
+    """Nearest location of each store chain, one KD-tree per chain.
+
+    Built once per catalog snapshot over the flattened store locations, so
+    routing never scans every location of every chain.
+    """
+
+    def __init__(self, locations: list[dict]):
+        by_chain: dict[str, list[dict]] = {}
+        for loc in locations:
+            by_chain.setdefault(loc["store_id"], []).append(loc)
+        self._locations = by_chain
+        self._trees = {
+            store_id: KDTree(unit_vectors([l["lat"] for l in locs], [l["lng"] for l in locs]))
+            for store_id, locs in by_chain.items()
+        }
+
+    def nearest_per_chain(self, lat: float, lng: float) -> dict[str, dict]:
+        """The closest location of every chain to (lat, lng)."""
+        query = unit_vectors(lat, lng)
+        return {store_id: self._locations[store_id][tree.nearest(query)] for store_id, tree in self._trees.items()}
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare store visiting orders: the old nearest-neighbour pass vs. Held-Karp.
+
+Generates random trips around Montreal (a home plus 2-6 stores), solves each
+with both methods and reports haversine round-trip length and solve time.
+The nearest-neighbour baseline uses raw lat/lng Euclidean distance, as the
+route optimizer used to.
+
+Usage: python scripts/benchmark_route_order.py [--trips 2000] [--seed 7]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from routing import distance_matrix, held_karp_order, nearest_neighbour_order, tour_length  # noqa: E402
+
+# Greater Montreal, roughly where the seeded store locations are
+LAT_RANGE = (45.42, 45.62)
+LNG_RANGE = (-73.76, -73.53)
+
+
+def _random_point(rng: random.Random) -> tuple[float, float]:
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+
+
+def _timed(solve, dist) -> tuple[list[int], float]:
+    start = time.perf_counter()
+    order = solve(dist)
+    return order, (time.perf_counter() - start) * 1e6
+
+
+def benchmark(trips: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"{'stores':>6} {'NN km':>8} {'HK km':>8} {'NN excess':>10} {'worst':>7} {'NN us':>8} {'HK us':>8}")
+    for n_stores in range(2, 7):
+        nn_km, hk_km, excess, nn_us, hk_us = [], [], [], [], []
+        for _ in range(trips):
+            points = [_random_point(rng) for _ in range(n_stores + 1)]
+            dist = distance_matrix(points)
+            degrees = np.array(points)
+            euclid = np.sqrt(((degrees[:, None, :] - degrees[None, :, :]) ** 2).sum(axis=2))
+
+            nn_order, nn_time = _timed(nearest_neighbour_order, euclid)
+            hk_order, hk_time = _timed(held_karp_order, dist)
+            nn_len, hk_len = tour_length(dist, nn_order), tour_length(dist, hk_order)
+
+            nn_km.append(nn_len)
+            hk_km.append(hk_len)
+            excess.append((nn_len / hk_len - 1) * 100 if hk_len else 0.0)
+            nn_us.append(nn_time)
+            hk_us.append(hk_time)
+
+        print(
+            f"{n_stores:>6} {np.mean(nn_km):>8.2f} {np.mean(hk_km):>8.2f} {np.mean(excess):>9.1f}% "
+            f"{np.max(excess):>6.1f}% {np.median(nn_us):>8.1f} {np.median(hk_us):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trips", type=int, default=2000, help="random trips per store count")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    benchmark(args.trips, args.seed)
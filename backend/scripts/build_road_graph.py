@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Build the offline road graph used by road_network.py from an OSM extract.
+
+Reads an OpenStreetMap XML extract (.osm, .osm.gz or .osm.bz2) of the
+service region, keeps drivable ways, weights each segment by length and
+speed (maxspeed tag, else a per-highway-class default), restricts the graph
+to its largest strongly connected component and contracts it into a
+contraction hierarchy. The result is a single .npz file; point the API at it
+with ROAD_GRAPH_PATH.
+
+Contraction runs in pure Python: expect minutes for a metropolitan extract.
+
+Usage: python scripts/build_road_graph.py montreal.osm.bz2 road_graph.npz
+"""
+
+import os
+import re
+import bz2
+import sys
+import gzip
+import time
+import argparse
+import xml.etree.ElementTree as ET
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from routing import haversine_km  # noqa: E402
+from road_network import RoadNetwork  # noqa: E402
+
+# Default speeds (km/h) by OSM highway class; anything else is not drivable
+HIGHWAY_SPEEDS = {
+    "motorway": 100, "motorway_link": 60,
+    "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 40,
+    "secondary": 50, "secondary_link": 40,
+    "tertiary": 40, "tertiary_link": 30,
+    "unclassified": 30, "residential": 30,
+    "living_street": 10, "service": 20,
+}
+
+_MAXSPEED_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph)?\s*$")
+
+
+def _open(path: str):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _speed(tags: dict) -> float:
+    match = _MAXSPEED_RE.match(tags.get("maxspeed", ""))
+    if match:
+        speed = float(match.group(1))
+        return speed * 1.609 if match.group(2) else speed
+    return HIGHWAY_SPEEDS[tags["highway"]]
+
+
+def _direction(tags: dict) -> int:
+    """1 = forward only, -1 = backward only, 0 = both ways."""
+    oneway = tags.get("oneway", "")
+    if oneway in ("yes", "true", "1"):
+        return 1
+    if oneway == "-1":
+        return -1
+    if oneway == "no":
+        return 0
+    if tags.get("highway") in ("motorway", "motorway_link") or tags.get("junction") in ("roundabout", "circular"):
+        return 1
+    return 0
+
+
+def parse_osm(path: str) -> tuple[dict[int, tuple[float, float]], list[tuple[int, int, float]]]:
+    """Node coordinates and directed (from, to, km/h) segments of drivable ways."""
+    coords: dict[int, tuple[float, float]] = {}
+    segments: list[tuple[int, int, float]] = []
+    with _open(path) as fh:
+        for _, elem in ET.iterparse(fh, events=("end",)):
+            if elem.tag == "node":
+                coords[int(elem.get("id"))] = (float(elem.get("lat")), float(elem.get("lon")))
+                elem.clear()
+            elif elem.tag == "way":
+                tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                if tags.get("highway") in HIGHWAY_SPEEDS and tags.get("access") not in ("no", "private"):
+                    refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                    speed = _speed(tags)
+                    direction = _direction(tags)
+                    for a, b in zip(refs, refs[1:]):
+                        if direction >= 0:
+                            segments.append((a, b, speed))
+                        if direction <= 0:
+                            segments.append((b, a, speed))
+                elem.clear()
+            elif elem.tag == "relation":
+                elem.clear()
+    return coords, segments
+
+
+def largest_component(node_count: int, edges: list[tuple[int, int]]) -> list[int]:
+    """Nodes of the largest strongly connected component (iterative Kosaraju)."""
+    out = [[] for _ in range(node_count)]
+    inc = [[] for _ in range(node_count)]
+    for a, b in edges:
+        out[a].append(b)
+        inc[b].append(a)
+
+    visited = [False] * node_count
+    finish_order = []
+    for start in range(node_count):
+        if visited[start]:
+            continue
+        visited[start] = True
+        stack = [(start, iter(out[start]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if not visited[child]:
+                    visited[child] = True
+                    stack.append((child, iter(out[child])))
+                    break
+            else:
+                stack.pop()
+                finish_order.append(node)
+
+    component = [-1] * node_count
+    sizes = []
+    for start in reversed(finish_order):
+        if component[start] != -1:
+            continue
+        label = len(sizes)
+        component[start] = label
+        stack, size = [start], 0
+        while stack:
+            node = stack.pop()
+            size += 1
+            for parent in inc[node]:
+                if component[parent] == -1:
+                    component[parent] = label
+                    stack.append(parent)
+        sizes.append(size)
+
+    biggest = int(np.argmax(sizes)) if sizes else -1
+    return [v for v in range(node_count) if component[v] == biggest]
+
+
+def build_road_graph(source: str, output: str) -> RoadNetwork:
+    started = time.perf_counter()
+    coords, segments = parse_osm(source)
+    used = sorted({a for a, _, _ in segments} | {b for _, b, _ in segments})
+    index = {osm_id: i for i, osm_id in enumerate(used)}
+    print(f"Parsed {len(used)} road nodes and {len(segments)} directed segments")
+
+    pairs = [(index[a], index[b]) for a, b, _ in segments]
+    keep = largest_component(len(used), pairs)
+    remap = {old: new for new, old in enumerate(keep)}
+    print(f"Largest strongly connected component: {len(keep)} nodes")
+
+    lat = np.array([coords[used[old]][0] for old in keep])
+    lng = np.array([coords[used[old]][1] for old in keep])
+    edges = []
+    for (a, b), (_, _, speed) in zip(pairs, segments):
+        if a in remap and b in remap:
+            km = haversine_km(lat[remap[a]], lng[remap[a]], lat[remap[b]], lng[remap[b]])
+            edges.append((remap[a], remap[b], km / speed * 3600, km * 1000))
+
+    network = RoadNetwork.from_edges(lat, lng, edges)
+    network.save(output)
+    print(f"Contracted and saved {output} in {time.perf_counter() - started:.1f}s")
+    return network
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline road graph from an OSM extract")
+    parser.add_argument("source", help="OSM XML extract (.osm, .osm.gz, .osm.bz2)")
+    parser.add_argument("output", help="output .npz path (set ROAD_GRAPH_PATH to it)")
+    args = parser.parse_args()
+    build_road_graph(args.source, args.output)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Verify that every hot query is served by an index.
+
+Runs explain() for each entry in indexes.HOT_QUERIES and exits non-zero if
+any winning plan contains a COLLSCAN stage.
+"""
+
+import os
+import sys
+import certifi
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from indexes import HOT_QUERIES, plan_stages  # noqa: E402
+
+load_dotenv()
+
+
+def check_query_plans():
+    """Explain each hot query; return True when none of them scans a collection."""
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        print("ERROR: MONGODB_URI not found in environment")
+        return False
+
+    client = MongoClient(uri, tlsCAFile=certifi.where())
+    db = client.inflationfighter
+
+    ok = True
+    for collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.explain()
+        stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        status = "FAIL" if "COLLSCAN" in stages else "ok"
+        if status == "FAIL":
+            ok = False
+        print(f"  [{status}] {collection} {query} sort={sort}: {' <- '.join(stages)}")
+
+    print("\nAll hot queries use indexes." if ok else "\nCOLLSCAN detected - run seed_db.py or start the API to create indexes.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
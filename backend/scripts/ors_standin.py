@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenRouteService directions endpoint.
+
+Answers POST /v2/directions/driving-car with straight-line legs (haversine x
+road factor at a fixed average speed) so route caching and failure handling
+can be exercised without an API key or quota. Point the API at it with:
+
+    OPENROUTE_API_KEY=dev OPENROUTE_URL=http://127.0.0.1:8090/v2/directions/driving-car
+
+Usage: python scripts/ors_standin.py [--port 8090] [--delay-ms 300] [--fail-rate 0.0]
+                                    [--tail-rate 0.05 --tail-ms 3000]
+"""
+
+import os
+import sys
+import random
+import asyncio
+import argparse
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import polyline  # noqa: E402
+from routing import AVERAGE_SPEED_KMH, ROAD_DISTANCE_FACTOR, haversine_km  # noqa: E402
+
+app = FastAPI(title="ORS stand-in")
+app.state.delay_ms = 0.0
+app.state.fail_rate = 0.0
+app.state.tail_rate = 0.0
+app.state.tail_ms = 0.0
+app.state.requests = 0
+
+
+@app.post("/v2/directions/driving-car")
+async def directions(request: Request):
+    app.state.requests += 1
+    delay_ms = app.state.delay_ms
+    if random.random() < app.state.tail_rate:
+        delay_ms += app.state.tail_ms
+    if delay_ms:
+        await asyncio.sleep(delay_ms / 1000)
+    if random.random() < app.state.fail_rate:
+        return JSONResponse(status_code=503, content={"error": "stand-in failure"})
+
+    body = await request.json()
+    coordinates = body["coordinates"]  # [[lng, lat], ...]
+    distance_km = sum(
+        haversine_km(a[1], a[0], b[1], b[0]) for a, b in zip(coordinates, coordinates[1:])
+    ) * ROAD_DISTANCE_FACTOR
+    return {
+        "routes": [{
+            "summary": {
+                "distance": round(distance_km * 1000, 1),
+                "duration": round(distance_km / AVERAGE_SPEED_KMH * 3600, 1),
+            },
+            "geometry": polyline.encode([(lat, lng) for lng, lat in coordinates]),
+        }]
+    }
+
+
+@app.get("/stats")
+async def stats():
+    return {"requests": app.state.requests}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenRouteService stand-in")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="added latency per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests delayed by --tail-ms")
+    parser.add_argument("--tail-ms", type=float, default=0.0, help="extra latency for tail requests")
+    args = parser.parse_args()
+    app.state.delay_ms = args.delay_ms
+    app.state.fail_rate = args.fail_rate
+    app.state.tail_rate = args.tail_rate
+    app.state.tail_ms = args.tail_ms
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
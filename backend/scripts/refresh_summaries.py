@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Recompute the materialized summary fields on every category document.
+
+Run this after any price update that bypasses seed_db.py. It also
+bumps metadata.last_updated so running API servers reload their catalog.
+"""
+
+import os
+import sys
+from datetime import datetime
+import certifi
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pricing import summary_fields  # noqa: E402
+
+load_dotenv()
+
+
+def refresh_summaries():
+    """Write cheapest/most-expensive/savings fields derived from regular prices."""
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        print("ERROR: MONGODB_URI not found in environment")
+        return False
+
+    try:
+        print("Connecting to MongoDB Atlas...")
+        client = MongoClient(uri, tlsCAFile=certifi.where())
+        client.admin.command('ping')
+        print("Connected!")
+
+        db = client.inflationfighter
+
+        updates = []
+        for cat in db.categories.find({}, {"prices": 1}):
+            fields = summary_fields(cat)
+            if fields:
+                updates.append(UpdateOne({"_id": cat["_id"]}, {"$set": fields}))
+
+        if not updates:
+            print("No categories with prices found.")
+            return False
+
+        result = db.categories.bulk_write(updates, ordered=False)
+        print(f"Updated summary fields on {result.modified_count} of {len(updates)} categories")
+
+        db.metadata.update_one(
+            {"key": "prices"},
+            {"$set": {"last_updated": datetime.utcnow().isoformat() + "Z"}},
+            upsert=True
+        )
+        print("Bumped metadata.last_updated")
+        return True
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    refresh_summaries()
@@ -3,6 +3,7 @@
 
 import os
 import re
+import sys
 import ast
 import random
 import certifi
@@ -10,6 +11,11 @@ import pandas as pd
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pricing import summary_fields  # noqa: E402
+from indexes import apply_indexes  # noqa: E402
+from equivalence import assign_equivalence_groups  # noqa: E402
+
 load_dotenv()
 
 # Quebec/Montreal store chains with multiple locations per chain
@@ -183,7 +189,7 @@ def slugify(text):
 
 
 def load_products_from_csv():
-    """Load products from Loblaws CSV file."""
+    """Load products from Loblaws CSV file as (row, matched pattern) pairs."""
     csv_path = os.path.join(os.path.dirname(__file__), '..', 'grocery_data_jan_2025.csv')
 
     if not os.path.exists(csv_path):
@@ -462,7 +468,7 @@ def load_products_from_csv():
         for _, row in df.iterrows():
             title = row['title']
             if title not in used_titles and matches_search(title, pattern, excludes):
-                selected_products.append(row)
+                selected_products.append((row, pattern))
                 used_titles.add(title)
                 break
 
@@ -473,7 +479,7 @@ def load_products_from_csv():
         for _, row in df.iterrows():
             title = row['title']
             if title not in used_titles and matches_search(title, pattern, excludes):
-                selected_products.append(row)
+                selected_products.append((row, pattern))
                 used_titles.add(title)
                 break
 
@@ -484,7 +490,7 @@ def load_products_from_csv():
         for _, row in df.iterrows():
             title = row['title']
             if title not in used_titles and matches_search(title, pattern, excludes):
-                selected_products.append(row)
+                selected_products.append((row, pattern))
                 used_titles.add(title)
                 break
 
@@ -495,7 +501,7 @@ def load_products_from_csv():
         for _, row in df.iterrows():
             title = row['title']
             if title not in used_titles and matches_search(title, pattern, excludes):
-                selected_products.append(row)
+                selected_products.append((row, pattern))
                 used_titles.add(title)
                 break
 
@@ -509,7 +515,7 @@ def load_products_from_csv():
                 break
             title = row['title']
             if title not in used_titles and matches_search(title, pattern, excludes):
-                selected_products.append(row)
+                selected_products.append((row, pattern))
                 used_titles.add(title)
 
     # Second pass: fill remaining slots with other products
@@ -518,7 +524,7 @@ def load_products_from_csv():
         for _, row in remaining.iterrows():
             if len(selected_products) >= 1000:
                 break
-            selected_products.append(row)
+            selected_products.append((row, None))
 
     print(f"Selected {len(selected_products)} diverse products")
     return selected_products
@@ -556,16 +562,24 @@ def create_categories_from_csv():
     """Create category documents from CSV data."""
     products = load_products_from_csv()
     categories = []
+    patterns = []
+    used_ids = set()
 
-    for idx, row in enumerate(products):
+    for idx, (row, pattern) in enumerate(products):
         title = row['title']
         loblaws_price = float(row['pricing.price']) if pd.notna(row['pricing.price']) else 2.99
         image_url = extract_image_url(row['productImage'])
         package_sizing = row['packageSizing'] if pd.notna(row['packageSizing']) else "1 ea"
         brand = row['brand'] if pd.notna(row['brand']) else ""
 
-        # Create category_id from title
-        category_id = slugify(title)
+        # Create category_id from title (slugs are truncated, so keep them unique)
+        base_id = slugify(title)
+        category_id = base_id
+        suffix = 2
+        while category_id in used_ids:
+            category_id = f"{base_id}-{suffix}"
+            suffix += 1
+        used_ids.add(category_id)
 
         # Generate prices for all stores
         prices = generate_store_prices(loblaws_price)
@@ -573,9 +587,6 @@ def create_categories_from_csv():
         # Generate deals for some products
         deals = generate_deals(prices)
 
-        # Find cheapest store
-        cheapest_store = min(prices, key=prices.get)
-
         # Generate previous price (10-25% higher than current Loblaws price)
         previous_price = round(loblaws_price * random.uniform(1.10, 1.25), 2)
 
@@ -602,7 +613,15 @@ def create_categories_from_csv():
             "sort_order": idx,  # Maintain essentials-first ordering
         }
 
+        # Materialize list-view fields (cheapest store, most expensive price, savings)
+        category.update(summary_fields(category))
+
         categories.append(category)
+        patterns.append(pattern)
+
+    # Same commodity under different SKUs shares a group the basket optimizer can substitute within
+    grouped = assign_equivalence_groups(categories, patterns)
+    print(f"Built {grouped} equivalence groups")
 
     return categories
 
@@ -628,6 +647,10 @@ def seed_database():
         db.categories.delete_many({})
         db.metadata.delete_many({})
 
+        print("Ensuring indexes...")
+        for name, created in apply_indexes(db).items():
+            print(f"  {name}: {', '.join(created)}")
+
         print(f"Inserting {len(STORES)} stores...")
         db.stores.insert_many(STORES)
 
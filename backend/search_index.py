@@ -0,0 +1,312 @@
+"""
+Copyright (c) 2026 Savour. All Rights Reserved.
+
+This software and associated documentation files are proprietary and confidential.
+Unauthorized copying, distribution, modification, or use of this software,
+via any medium, is strictly prohibited without express written permission from Savour.
+"""
+
+import re
+import bisect
+import unicodedata
+from typing import Iterable
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Match tiers, best first in ranking
+EXACT_NAME = 5
+EXACT = 4
+PREFIX = 3
+SUBSTRING = 2
+FUZZY = 1
+
+# Query tokens up to this length are looked up directly in the n-gram table
+_GRAM_SIZE = 3
+
+# Typo tolerance: tokens shorter than _FUZZY_MIN_LEN are never corrected, and
+# tokens shorter than _FUZZY_LONG_LEN allow a single edit instead of two
+MAX_EDIT_DISTANCE = 2
+_FUZZY_MIN_LEN = 3
+_FUZZY_LONG_LEN = 5
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so "Crème" and "creme" index the same."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _grams(token: str) -> set[str]:
+    """All substrings of length 1.._GRAM_SIZE (short grams answer short queries exactly)."""
+    grams = set()
+    for n in range(1, _GRAM_SIZE + 1):
+        for i in range(len(token) - n + 1):
+            grams.add(token[i:i + n])
+    return grams
+
+
+def _max_edits(token: str) -> int:
+    if len(token) < _FUZZY_MIN_LEN:
+        return 0
+    return 1 if len(token) < _FUZZY_LONG_LEN else MAX_EDIT_DISTANCE
+
+
+def _deletes(token: str, max_edits: int) -> set[str]:
+    """Every string reachable from token by up to max_edits character deletions."""
+    result = {token}
+    frontier = {token}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class DeletionIndex:
+    """Symmetric-deletion (SymSpell) index: typo lookups without scanning the vocabulary.
+
+    Each vocabulary token is stored under all of its deletion variants. A query
+    generates its own variants and only the tokens sharing one are verified
+    with a real edit distance, so lookup cost depends on query length, not on
+    vocabulary size.
+    """
+
+    def __init__(self, vocabulary: Iterable[str]):
+        self._variants: dict[str, set[str]] = {}
+        for token in vocabulary:
+            for variant in _deletes(token, _max_edits(token)):
+                self._variants.setdefault(variant, set()).add(token)
+
+    def lookup(self, query: str) -> list[str]:
+        """Vocabulary tokens at the smallest edit distance from query (within its limit)."""
+        limit = _max_edits(query)
+        if not limit:
+            return []
+
+        candidates: set[str] = set()
+        for variant in _deletes(query, limit):
+            candidates |= self._variants.get(variant, set())
+
+        best = limit + 1
+        closest: list[str] = []
+        for token in candidates:
+            distance = edit_distance(query, token, min(limit, _max_edits(token)))
+            if distance < best:
+                best, closest = distance, [token]
+            elif distance == best and distance <= limit:
+                closest.append(token)
+        return sorted(closest) if best <= limit else []
+
+
+class SearchIndex:
+    """Inverted index over category name, brand and search terms.
+
+    Documents are addressed by their position in the input list, which the
+    catalog keeps in sort_order, so a lower doc id always ranks first among
+    equal match tiers.
+    """
+
+    def __init__(self, categories: list[dict]):
+        self._docs = categories
+        self._names = [" ".join(tokenize(c["name"])) for c in categories]
+
+        postings: dict[str, set[int]] = {}
+        for doc_id, cat in enumerate(categories):
+            fields: list[str] = [cat["name"], cat.get("brand") or ""]
+            fields.extend(cat.get("search_terms", []))
+            for field in fields:
+                for token in tokenize(field):
+                    postings.setdefault(token, set()).add(doc_id)
+
+        self._postings = {token: sorted(ids) for token, ids in postings.items()}
+        self._vocab = sorted(self._postings)
+
+        self._gram_postings: dict[str, set[str]] = {}
+        for token in self._vocab:
+            for gram in _grams(token):
+                self._gram_postings.setdefault(gram, set()).add(token)
+
+        self._fuzzy = DeletionIndex(self._vocab)
+
+    def _prefix_tokens(self, q: str) -> Iterable[str]:
+        start = bisect.bisect_left(self._vocab, q)
+        end = bisect.bisect_left(self._vocab, q + "\uffff", start)
+        return self._vocab[start:end]
+
+    def _substring_tokens(self, q: str) -> set[str]:
+        if len(q) <= _GRAM_SIZE:
+            return self._gram_postings.get(q, set())
+        candidates = None
+        for i in range(len(q) - _GRAM_SIZE + 1):
+            tokens = self._gram_postings.get(q[i:i + _GRAM_SIZE])
+            if not tokens:
+                return set()
+            candidates = set(tokens) if candidates is None else candidates & tokens
+            if not candidates:
+                return set()
+        return {t for t in candidates if q in t}
+
+    def _token_matches(self, q: str) -> dict[int, int]:
+        """Best match tier per document for a single query token."""
+        tiers: dict[int, int] = {}
+
+        def add(token: str, tier: int):
+            for doc_id in self._postings[token]:
+                if tiers.get(doc_id, 0) < tier:
+                    tiers[doc_id] = tier
+
+        for token in self._substring_tokens(q):
+            add(token, SUBSTRING)
+        for token in self._prefix_tokens(q):
+            add(token, PREFIX)
+        if q in self._postings:
+            add(q, EXACT)
+        if not tiers:
+            # Nothing spelled like this: fall back to the closest tokens by edit distance
+            for token in self._fuzzy.lookup(q):
+                add(token, FUZZY)
+        return tiers
+
+    def search(self, query: str, limit: int = 100) -> list[dict]:
+        """Documents matching every query token, ranked exact > prefix > substring > fuzzy, then sort_order."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        scores: dict[int, int] = {}
+        for i, q in enumerate(tokens):
+            matches = self._token_matches(q)
+            if i == 0:
+                scores = matches
+            else:
+                # A document ranks by its weakest token match
+                scores = {d: min(tier, matches[d]) for d, tier in scores.items() if d in matches}
+            if not scores:
+                return []
+
+        phrase = " ".join(tokens)
+        for doc_id in scores:
+            if self._names[doc_id] == phrase:
+                scores[doc_id] = EXACT_NAME
+
+        ranked = sorted(scores, key=lambda d: (-scores[d], d))
+        return [self._docs[d] for d in ranked[:limit]]
+
+
+# Trie depth cap; longer prefixes filter the keys stored at the capped node
+MAX_SUGGEST_DEPTH = 24
+SUGGEST_TOP_K = 10
+
+# Share of a completion's score that comes from savings_percent; the rest is catalog position (sort_order)
+SUGGEST_SAVINGS_WEIGHT = 0.3
+
+
+class _TrieNode:
+    __slots__ = ("children", "docs", "top", "tail")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.docs: set[int] = set()
+        self.top: tuple[int, ...] = ()
+        self.tail: list[tuple[str, int]] = []
+
+
+class SuggestTrie:
+    """Prefix trie over normalized names and search terms with top-k completions per node.
+
+    Completions rank by one score blending catalog position (sort_order,
+    scaled to 1 for the first category and 0 for the last) with
+    savings_percent / 100, weighted by SUGGEST_SAVINGS_WEIGHT; sort_order
+    breaks ties. Every node stores its precomputed top-k doc ids, so a lookup
+    is a walk of len(prefix) steps with no sorting.
+    """
+
+    def __init__(self, categories: list[dict], k: int = SUGGEST_TOP_K):
+        self._docs = categories
+        self._k = k
+        self._rank = self._scores(categories)
+        self._root = _TrieNode()
+
+        for doc_id, cat in enumerate(categories):
+            keys = {" ".join(tokenize(cat["name"]))}
+            keys.update(" ".join(tokenize(term)) for term in cat.get("search_terms", []))
+            for key in keys:
+                if key:
+                    self._insert(key, doc_id)
+
+        self._finalize(self._root)
+
+    @staticmethod
+    def _scores(categories: list[dict]) -> list[tuple[float, int]]:
+        """Sort keys per doc id: (-blended score, sort_order)."""
+        sort_orders = [c.get("sort_order", i) for i, c in enumerate(categories)]
+        by_position = sorted(range(len(categories)), key=sort_orders.__getitem__)
+        last = max(len(categories) - 1, 1)
+        position = [0.0] * len(categories)
+        for place, doc_id in enumerate(by_position):
+            position[doc_id] = 1 - place / last
+        return [
+            (-((1 - SUGGEST_SAVINGS_WEIGHT) * position[i]
+               + SUGGEST_SAVINGS_WEIGHT * c.get("savings_percent", 0) / 100), sort_orders[i])
+            for i, c in enumerate(categories)
+        ]
+
+    def _insert(self, key: str, doc_id: int) -> None:
+        node = self._root
+        for depth, ch in enumerate(key):
+            if depth == MAX_SUGGEST_DEPTH:
+                node.tail.append((key, doc_id))
+                return
+            node = node.children.setdefault(ch, _TrieNode())
+        node.docs.add(doc_id)
+
+    def _best(self, doc_ids) -> tuple[int, ...]:
+        return tuple(sorted(set(doc_ids), key=self._rank.__getitem__)[:self._k])
+
+    def _finalize(self, node: _TrieNode) -> None:
+        candidates = list(node.docs)
+        candidates.extend(doc_id for _, doc_id in node.tail)
+        for child in node.children.values():
+            self._finalize(child)
+            candidates.extend(child.top)
+        node.top = self._best(candidates)
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_TOP_K) -> list[dict]:
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+
+        node = self._root
+        for ch in key[:MAX_SUGGEST_DEPTH]:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        if len(key) <= MAX_SUGGEST_DEPTH:
+            top = node.top
+        else:
+            # Past the depth cap the node keeps full keys; filter them instead of walking
+            top = self._best(d for k, d in node.tail if k.startswith(key))
+        return [self._docs[d] for d in top[:limit]]
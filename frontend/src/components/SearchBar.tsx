@@ -1,4 +1,11 @@
 import { useState, useEffect } from 'react';
+import { useNavigate } from 'react-router-dom';
+import { suggestCategories } from '../lib/api';
+import type { Suggestion } from '../lib/types';
+
+// Wait for a pause in typing before asking for suggestions
+const SUGGEST_DELAY_MS = 150;
+const SUGGEST_MIN_CHARS = 2;
 
 interface SearchBarProps {
   value: string;
@@ -15,19 +22,44 @@ export default function SearchBar({
   placeholder = 'Search groceries...',
   compact = false,
 }: SearchBarProps) {
+  const navigate = useNavigate();
   const [localValue, setLocalValue] = useState(value);
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
 
   useEffect(() => {
     setLocalValue(value);
   }, [value]);
 
+  useEffect(() => {
+    const prefix = localValue.trim();
+    if (prefix.length < SUGGEST_MIN_CHARS) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timeoutId = setTimeout(() => {
+      suggestCategories(prefix)
+        .then((results) => {
+          if (!cancelled) setSuggestions(results);
+        })
+        .catch((err) => console.error('Suggestion error:', err));
+    }, SUGGEST_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timeoutId);
+    };
+  }, [localValue]);
+
   const handleChange = (newValue: string) => {
     setLocalValue(newValue);
+    setShowSuggestions(true);
     onChange(newValue);
   };
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
+    setShowSuggestions(false);
     if (onSubmit && localValue.trim()) {
       onSubmit(localValue.trim());
     }
@@ -38,6 +70,13 @@ export default function SearchBar({
     onChange('');
   };
 
+  // mousedown rather than click: it fires before the input's blur hides the list
+  const handleSuggestionMouseDown = (e: React.MouseEvent, suggestion: Suggestion) => {
+    e.preventDefault();
+    setShowSuggestions(false);
+    navigate(`/category/${suggestion.category_id}`);
+  };
+
   return (
     <form onSubmit={handleSubmit} className={`relative w-full ${compact ? '' : 'max-w-xl mx-auto'}`}>
       <div className={`absolute inset-y-0 left-0 flex items-center ${compact ? 'pl-4' : 'pl-5'} pointer-events-none`}>
@@ -60,6 +99,8 @@ export default function SearchBar({
         type="text"
         value={localValue}
         onChange={(e) => handleChange(e.target.value)}
+        onFocus={() => setShowSuggestions(true)}
+        onBlur={() => setShowSuggestions(false)}
         placeholder={placeholder}
         className={`w-full text-charcoal bg-white border border-border rounded-full
                    placeholder:text-muted font-ui
@@ -89,6 +130,23 @@ export default function SearchBar({
           </svg>
         </button>
       )}
+      {showSuggestions && suggestions.length > 0 && (
+        <ul className="absolute left-0 right-0 top-full mt-2 z-50 bg-white border border-border rounded-xl shadow-lift overflow-hidden font-ui">
+          {suggestions.map((suggestion) => (
+            <li key={suggestion.category_id}>
+              <button
+                type="button"
+                onMouseDown={(e) => handleSuggestionMouseDown(e, suggestion)}
+                className={`w-full flex items-center justify-between gap-4 text-left hover:bg-cream transition-colors
+                           ${compact ? 'px-4 py-2 text-sm' : 'px-5 py-3'}`}
+              >
+                <span className="text-charcoal truncate">{suggestion.name}</span>
+                <span className="text-muted flex-shrink-0">${suggestion.cheapest_price.toFixed(2)}</span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
     </form>
   );
 }
@@ -8,7 +8,7 @@
 
 import type {
   Store, Category, CategoryDetail, BasketAnalysis, RecipeGenerateResponse,
-  Location, RouteSettings, RouteOptimizeResponse, StoreWithLocation
+  Location, RouteSettings, RouteOptimizeResponse, StoreWithLocation, Suggestion
 } from './types';
 
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
@@ -53,6 +53,17 @@ export async function searchCategories(q: string): Promise<Category[]> {
   return data.categories || data;
 }
 
+export async function suggestCategories(prefix: string, limit = 8): Promise<Suggestion[]> {
+  const response = await fetch(
+    `${API_BASE}/api/categories/suggest?prefix=${encodeURIComponent(prefix)}&limit=${limit}`
+  );
+  if (!response.ok) {
+    throw new Error('Failed to fetch suggestions');
+  }
+  const data = await response.json();
+  return data.suggestions;
+}
+
 export async function getCategory(id: string): Promise<CategoryDetail> {
   const response = await fetch(`${API_BASE}/api/categories/${encodeURIComponent(id)}`);
   if (!response.ok) {
@@ -61,20 +72,56 @@ export async function getCategory(id: string): Promise<CategoryDetail> {
   return response.json();
 }
 
-export async function analyzeBasket(
-  items: { category_id: string; quantity: number }[]
-): Promise<BasketAnalysis> {
-  const response = await fetch(`${API_BASE}/api/basket/analyze`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({ items }),
-  });
-  if (!response.ok) {
-    throw new Error('Failed to analyze basket');
-  }
-  return response.json();
+export interface BasketSession {
+  add(categoryId: string, quantity?: number): void;
+  set(categoryId: string, quantity: number): void;
+  remove(categoryId: string): void;
+  clear(): void;
+  close(): void;
+}
+
+/**
+ * Opens a server-side basket session. Each edit sends one delta and the
+ * server pushes back the updated analysis (null while the basket is empty).
+ */
+export function openBasketSession(
+  onAnalysis: (analysis: BasketAnalysis | null) => void,
+  onError?: (detail: unknown) => void
+): BasketSession {
+  const socket = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/ws/basket`);
+  const pending: string[] = [];
+
+  socket.onopen = () => {
+    pending.splice(0).forEach((message) => socket.send(message));
+  };
+  socket.onerror = () => {
+    onError?.('Basket session connection failed');
+  };
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === 'analysis') {
+      onAnalysis(message.analysis);
+    } else {
+      onError?.(message.detail);
+    }
+  };
+
+  const send = (delta: object) => {
+    const message = JSON.stringify(delta);
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(message);
+    } else {
+      pending.push(message);
+    }
+  };
+
+  return {
+    add: (categoryId, quantity = 1) => send({ op: 'add', category_id: categoryId, quantity }),
+    set: (categoryId, quantity) => send({ op: 'set', category_id: categoryId, quantity }),
+    remove: (categoryId) => send({ op: 'remove', category_id: categoryId }),
+    clear: () => send({ op: 'clear' }),
+    close: () => socket.close(),
+  };
 }
 
 export async function generateRecipe(payload: {
@@ -119,9 +166,10 @@ export async function checkRecipeAvailability(): Promise<boolean> {
 export async function optimizeRoute(
   items: { category_id: string; quantity: number }[],
   userLocation: Location,
-  settings?: Partial<RouteSettings>
+  settings?: Partial<RouteSettings>,
+  detail: 'low' | 'high' = 'high'
 ): Promise<RouteOptimizeResponse> {
-  const response = await fetch(`${API_BASE}/api/routes/optimize`, {
+  const response = await fetch(`${API_BASE}/api/routes/optimize?detail=${detail}`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -28,6 +28,12 @@ export interface Category {
   availability?: string;
 }
 
+export interface Suggestion {
+  category_id: string;
+  name: string;
+  cheapest_price: number;
+}
+
 export interface BasketItem {
   category_id: string;
   name: string;
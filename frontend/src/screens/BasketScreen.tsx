@@ -6,11 +6,12 @@
  * via any medium, is strictly prohibited without express written permission from Savour.
  */
 
-import { useState, useEffect, useMemo } from 'react';
+import { useState, useEffect, useMemo, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import Joyride, { type CallBackProps, STATUS } from 'react-joyride';
 import { useBasket } from '../context/BasketContext';
-import { analyzeBasket, getCategories, generateRecipe, checkRecipeAvailability } from '../lib/api';
+import { openBasketSession, getCategories, generateRecipe, checkRecipeAvailability } from '../lib/api';
+import type { BasketSession } from '../lib/api';
 import type { BasketAnalysis, Category, RecipeGenerateResponse } from '../lib/types';
 import CartItemCard from '../components/CartItemCard';
 import PriceSummary from '../components/PriceSummary';
@@ -110,40 +111,57 @@ export default function BasketScreen() {
     setSelectedItems(new Set(items.map(item => item.category_id)));
   }, [items]);
 
-  // Fetch analysis whenever basket items or selection changes (debounced)
+  // One basket session per visit; the server pushes a fresh analysis after every edit
+  const sessionRef = useRef<BasketSession | null>(null);
+  const sentRef = useRef<Map<string, number>>(new Map());
   useEffect(() => {
-    // Filter to only selected items
-    const selectedBasketItems = items.filter(item => selectedItems.has(item.category_id));
+    const session = openBasketSession(
+      (result) => {
+        setAnalysis(result);
+        setLoading(false);
+      },
+      (detail) => {
+        setError('Failed to analyze basket. Please try again.');
+        setLoading(false);
+        console.error('Analysis error:', detail);
+      }
+    );
+    sessionRef.current = session;
+    sentRef.current = new Map();
+    return () => session.close();
+  }, []);
 
-    if (selectedBasketItems.length === 0) {
+  // Send only what changed in the selected items since the last edit
+  useEffect(() => {
+    const session = sessionRef.current;
+    if (!session) return;
+
+    const wanted = new Map(
+      items.filter(item => selectedItems.has(item.category_id)).map(item => [item.category_id, item.quantity])
+    );
+    const sent = sentRef.current;
+    let changed = false;
+    sent.forEach((_, categoryId) => {
+      if (!wanted.has(categoryId)) {
+        session.remove(categoryId);
+        changed = true;
+      }
+    });
+    wanted.forEach((quantity, categoryId) => {
+      if (sent.get(categoryId) !== quantity) {
+        session.set(categoryId, quantity);
+        changed = true;
+      }
+    });
+    sentRef.current = wanted;
+
+    if (wanted.size === 0) {
       setAnalysis(null);
       setRecipe(null);
-      return;
+    } else if (changed) {
+      setLoading(true);
+      setError(null);
     }
-
-    const timeoutId = setTimeout(() => {
-      const fetchAnalysis = async () => {
-        setLoading(true);
-        setError(null);
-        try {
-          const basketItems = selectedBasketItems.map((item) => ({
-            category_id: item.category_id,
-            quantity: item.quantity,
-          }));
-          const result = await analyzeBasket(basketItems);
-          setAnalysis(result);
-        } catch (err) {
-          setError('Failed to analyze basket. Please try again.');
-          console.error('Analysis error:', err);
-        } finally {
-          setLoading(false);
-        }
-      };
-
-      fetchAnalysis();
-    }, 300); // Debounce 300ms
-
-    return () => clearTimeout(timeoutId);
   }, [items, selectedItems]);
 
   // Get price info for each item